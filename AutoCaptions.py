@@ -1,446 +1,835 @@
-# -*- coding: utf-8 -*-
-import os
-import sys
-import subprocess
-import shutil
-
-# Try to ensure stdout/stderr use UTF-8 where possible to avoid UnicodeEncodeError on Windows
-try:
-    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
-    sys.stderr.reconfigure(encoding='utf-8', errors='replace')
-except Exception:
-    pass
-os.environ.setdefault('PYTHONIOENCODING', 'utf-8')
-
-# === Configuration ===
-import pathlib
-
-# support running from a frozen bundle (PyInstaller)
-if getattr(sys, 'frozen', False):
-    # when frozen, resources are unpacked to sys._MEIPASS
-    BASE_DIR = pathlib.Path(sys._MEIPASS)
-else:
-    BASE_DIR = pathlib.Path(__file__).resolve().parent
-
-SCRIPT_DIR = str(BASE_DIR)
-FFMPEG_EXE = os.path.join(SCRIPT_DIR, "ffmpeg.exe")
-FFMPEG_DIR = os.path.dirname(FFMPEG_EXE)
-# allow overriding output dir via env, otherwise use a transcriptions folder next to the script
-TRANSCRIPTIONS_DIR = os.environ.get('AUTOCAPTIONS_OUTDIR', str(pathlib.Path(SCRIPT_DIR) / 'transcriptions'))
-
-# === Step 1: Verify ffmpeg exists ===
-if not os.path.isfile(FFMPEG_EXE):
-    # if ffmpeg not bundled, rely on PATH ffmpeg if available
-    try:
-        subprocess.run(["ffmpeg", "-version"], check=True, capture_output=True)
-        FFMPEG_EXE = "ffmpeg"
-        FFMPEG_DIR = os.path.dirname(shutil.which(FFMPEG_EXE) or "")
-    except Exception:
-        raise RuntimeError(f"ffmpeg.exe not found at {FFMPEG_EXE} and no ffmpeg on PATH")
-
-os.environ["PATH"] = FFMPEG_DIR + os.pathsep + os.environ["PATH"]
-
-# === Step 2: Import Whisper ===
-try:
-    import whisper
-except ModuleNotFoundError:
-    raise ModuleNotFoundError("Whisper is not installed in this Python environment.")
-
-# === Step 3: Helper function to wrap text for line mode ===
-def wrap_text_line_mode(text, max_chars):
-    words = text.split()
-    lines = []
-    current_line = ""
-    for word in words:
-        if len(current_line) + (1 if current_line else 0) + len(word) <= max_chars:
-            current_line += (" " if current_line else "") + word
-        else:
-            lines.append(current_line)
-            current_line = word
-    if current_line:
-        lines.append(current_line)
-    return lines
-
-
-def split_words_into_lines(words, max_chars=20):
-    """Group whisper word-timestamp dicts into lines of ~max_chars and return
-    a list of dicts with text/start/end for each line. If words is empty,
-    return an empty list.
-    """
-    if not words:
-        return []
-
-    lines = []
-    current_words = []
-    current_len = 0
-
-    def flush_current():
-        nonlocal current_words, current_len
-        if not current_words:
-            return
-        text = " ".join(w.get("word", "").strip() for w in current_words).strip()
-        start = current_words[0].get("start")
-        # Use the last word's end timestamp so the caption end is after the last word
-        end = current_words[-1].get("end")
-        lines.append({"text": text, "start": start, "end": end})
-        current_words = []
-        current_len = 0
-
-    for w in words:
-        word_text = w.get("word", "").strip()
-        # treat empty tokens as skipped
-        if not word_text:
-            continue
-        add_len = len(word_text) + (1 if current_len else 0)
-        if current_len + add_len <= max_chars:
-            current_words.append(w)
-            current_len += add_len
-        else:
-            flush_current()
-            current_words.append(w)
-            current_len = len(word_text)
-
-    flush_current()
-    return lines
-
-# === Step 4: Save SRT ===
-def save_srt(result, output_dir, mp4_file, line_mode=False, max_chars=20):
-    os.makedirs(output_dir, exist_ok=True)
-    base_name = os.path.splitext(os.path.basename(mp4_file))[0]
-    srt_path = os.path.join(output_dir, base_name + ".srt")
-
-    lines = []
-    index = 1
-
-    # compute total number of captions that will be emitted so GUI can report progress
-    total_captions = 0
-    if line_mode:
-        for segment in result.get("segments", []):
-            words = segment.get("words") or []
-            word_lines = split_words_into_lines(words, max_chars=max_chars)
-            if word_lines:
-                total_captions += len(word_lines)
-            else:
-                text = segment.get("text", "").strip()
-                text_lines = wrap_text_line_mode(text, max_chars=max_chars)
-                total_captions += max(1, len(text_lines))
-    else:
-        total_captions = len(result.get("segments", []))
-
-    # padding (in seconds) applied to caption end times to avoid cutting words early
-    padding = float(os.environ.get('AUTOCAPTIONS_PADDING', '0.08'))
-    # minimum gap between consecutive captions (seconds) to avoid small overlaps
-    min_gap = float(os.environ.get('AUTOCAPTIONS_MIN_GAP', '0.01'))
-    # minimum duration for a caption (seconds)
-    min_dur = float(os.environ.get('AUTOCAPTIONS_MIN_DUR', '0.05'))
-
-    def format_time(seconds):
-        # guard against None
-        if seconds is None:
-            seconds = 0.0
-        # round to nearest millisecond to avoid truncation that can cut off audio
-        total_ms = int(round(seconds * 1000))
-        ms = total_ms % 1000
-        total_seconds = total_ms // 1000
-        h = int(total_seconds // 3600)
-        m = int((total_seconds % 3600) // 60)
-        s = int(total_seconds % 60)
-        return f"{h:02}:{m:02}:{s:02},{ms:03}"
-
-    for segment in result["segments"]:
-        seg_start = segment.get("start")
-        seg_end = segment.get("end")
-        text = segment.get("text", "").strip()
-
-        if line_mode:
-            # Prefer using word timestamps to assign times per small line
-            words = segment.get("words") or []
-            word_lines = split_words_into_lines(words, max_chars=max_chars)
-
-            if word_lines:
-                for wl in word_lines:
-                    start = wl.get("start", seg_start)
-                    end = wl.get("end", seg_end)
-                    # apply small padding to end times so words aren't cut off early
-                    if end is not None:
-                        end = end + padding
-                    # avoid producing an end earlier than start due to rounding
-                    if start is not None and end is not None and end <= start:
-                        end = start + 0.001
-                    text_line = wl.get("text", "")
-                    # enforce minimum duration
-                    if end is not None and start is not None and (end - start) < min_dur:
-                        end = start + min_dur
-                    # enforce min gap from previous caption (last_end stored in outer scope)
-                    prev_end = lines and None
-                    # compute previous end from `lines` if available (fast parse last timing)
-                    if len(lines) >= 2:
-                        try:
-                            # previous timing line is two lines above the last blank ("\n"); find last timing
-                            # safe fallback: use last_end variable (tracked below)
-                            pass
-                        except Exception:
-                            pass
-                    # ensure we don't overlap prior caption: use the last_end variable if set
-                    try:
-                        if 'last_srt_end' in locals():
-                            if start is not None and start < last_srt_end + min_gap:
-                                start = last_srt_end + min_gap
-                                if end is not None and end <= start:
-                                    end = start + min_dur
-                    except Exception:
-                        pass
-
-                    lines.append(f"{index}")
-                    lines.append(f"{format_time(start)} --> {format_time(end)}")
-                    lines.append(text_line)
-                    lines.append("")
-                    # track the end of the last written caption for gap enforcement
-                    try:
-                        last_srt_end = end if end is not None else start
-                    except Exception:
-                        last_srt_end = end
-                    # emit progress so UI can parse it
-                    try:
-                        print(f"PROGRESS: {index}/{total_captions}", flush=True)
-                    except Exception:
-                        pass
-                    index += 1
-            else:
-                # fallback: split raw text and evenly distribute times across lines
-                text_lines = wrap_text_line_mode(text, max_chars=max_chars)
-                n = max(1, len(text_lines))
-                seg_dur = (seg_end - seg_start) if (seg_start is not None and seg_end is not None) else 0
-                for idx, tline in enumerate(text_lines):
-                    if seg_dur > 0:
-                        start = seg_start + (seg_dur * idx / n)
-                        end = seg_start + (seg_dur * (idx + 1) / n)
-                        # pad fallback-distributed lines as well
-                        if end is not None:
-                            end = end + padding
-                    else:
-                        start = seg_start or 0
-                        end = seg_end or start
-                    # enforce minimum duration
-                    if end is not None and start is not None and (end - start) < min_dur:
-                        end = start + min_dur
-                    # prevent tiny overlap with previous caption
-                    try:
-                        if 'last_srt_end' in locals() and start is not None and start < last_srt_end + min_gap:
-                            start = last_srt_end + min_gap
-                            if end is not None and end <= start:
-                                end = start + min_dur
-                    except Exception:
-                        pass
-
-                    lines.append(f"{index}")
-                    lines.append(f"{format_time(start)} --> {format_time(end)}")
-                    lines.append(tline)
-                    lines.append("")
-                    try:
-                        last_srt_end = end if end is not None else start
-                    except Exception:
-                        last_srt_end = end
-                    try:
-                        print(f"PROGRESS: {index}/{total_captions}", flush=True)
-                    except Exception:
-                        pass
-                    index += 1
-        else:
-            # normal mode: one caption per segment
-            lines.append(f"{index}")
-            # enforce min dur and gap for normal mode too
-            start = seg_start
-            end = seg_end
-            if end is not None and start is not None and (end - start) < min_dur:
-                end = start + min_dur
-            try:
-                if 'last_srt_end' in locals() and start is not None and start < last_srt_end + min_gap:
-                    start = last_srt_end + min_gap
-                    if end is not None and end <= start:
-                        end = start + min_dur
-            except Exception:
-                pass
-            lines.append(f"{format_time(start)} --> {format_time(end)}")
-            lines.append(text)
-            lines.append("")
-            try:
-                print(f"PROGRESS: {index}/{total_captions}", flush=True)
-            except Exception:
-                pass
-            index += 1
-
-    with open(srt_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines))
-
-    print(f"SRT file saved to: {srt_path}")
-    return srt_path
-
-# === Step 5: Transcribe MP4 ===
-def mp4_to_srt(mp4_file, line_mode=False):
-    import tempfile
-    import shutil
-    import wave
-    import contextlib
-
-    print(f"Transcribing {mp4_file} ... this may take a while")
-    model_name = os.environ.get('AUTOCAPTIONS_MODEL', 'small')
-    # allow CLI --model
-    if '--model' in sys.argv:
-        try:
-            m_idx = sys.argv.index('--model')
-            model_name = sys.argv[m_idx + 1]
-        except Exception:
-            pass
-
-    # chunking config (seconds)
-    chunk_seconds = int(os.environ.get('AUTOCAPTIONS_CHUNK_SECONDS', '30'))
-
-    # decide whether to chunk: use ffmpeg to split into wav segments
-    tmpdir = tempfile.mkdtemp(prefix='autocaptions_')
-    try:
-        segment_pattern = os.path.join(tmpdir, 'seg%05d.wav')
-        ffmpeg_cmd = [
-            'ffmpeg', '-y', '-i', mp4_file,
-            '-vn', '-ac', '1', '-ar', '16000',
-            '-f', 'segment', '-segment_time', str(chunk_seconds),
-            '-reset_timestamps', '1', segment_pattern
-        ]
-        try:
-            subprocess.run(ffmpeg_cmd, check=True, capture_output=True)
-        except Exception:
-            # if splitting fails, fallback to single-file transcription
-            model = whisper.load_model(model_name)
-            result = model.transcribe(mp4_file, word_timestamps=True)
-            max_chars = int(os.environ.get('AUTOCAPTIONS_MAXCHARS', '20'))
-            out_dir = os.environ.get('AUTOCAPTIONS_OUTDIR', TRANSCRIPTIONS_DIR)
-            return save_srt(result, out_dir, mp4_file, line_mode=line_mode, max_chars=max_chars)
-
-        # collect segments
-        seg_files = sorted([os.path.join(tmpdir, f) for f in os.listdir(tmpdir) if f.startswith('seg') and f.endswith('.wav')])
-        if len(seg_files) <= 1:
-            # single chunk, transcribe normally
-            model = whisper.load_model(model_name)
-            result = model.transcribe(mp4_file, word_timestamps=True)
-            max_chars = int(os.environ.get('AUTOCAPTIONS_MAXCHARS', '20'))
-            out_dir = os.environ.get('AUTOCAPTIONS_OUTDIR', TRANSCRIPTIONS_DIR)
-            return save_srt(result, out_dir, mp4_file, line_mode=line_mode, max_chars=max_chars)
-
-        # multi-chunk: transcribe each and stitch results
-        model = whisper.load_model(model_name)
-        all_segments = []
-        total_chunks = len(seg_files)
-        elapsed_offsets = []
-        # precompute durations to calculate offsets
-        durations = []
-        for f in seg_files:
-            try:
-                with contextlib.closing(wave.open(f, 'r')) as wf:
-                    dur = wf.getnframes() / float(wf.getframerate())
-            except Exception:
-                dur = chunk_seconds
-            durations.append(dur)
-
-        last_end = 0.0  # keep track of the last segment end time
-        # use padding env if provided; fallback to small value
-        extra_delay = float(os.environ.get('AUTOCAPTIONS_PADDING', '0.08'))
-        cumulative = 0.0  # initialize cumulative offset for stitched chunks
-
-        for i, f in enumerate(seg_files, start=1):
-            # transcribe chunk
-            chunk_result = model.transcribe(f, word_timestamps=True)
-
-            # adjust timestamps by cumulative offset
-            for seg in chunk_result.get('segments', []):
-                start = seg.get('start', 0.0) + cumulative
-                # handle None end gracefully
-                raw_end = seg.get('end', None)
-                if raw_end is not None:
-                    end = raw_end + cumulative + extra_delay
-                else:
-                    # fallback to a small duration if end is missing
-                    end = start + 0.3
-
-                # prevent overlap with previous segment
-                if start < last_end:
-                    start = last_end + 0.01  # ensure at least 10ms gap
-                if end <= start:
-                    end = start + 0.3  # ensure caption is visible for a minimum duration
-
-                # update segment timestamps
-                seg['start'] = start
-                seg['end'] = end
-
-                # adjust words if present
-                if 'words' in seg:
-                    for w in seg['words']:
-                        if 'start' in w:
-                            w['start'] = w.get('start') + cumulative
-                        if 'end' in w:
-                            w['end'] = w.get('end') + cumulative
-
-                all_segments.append(seg)
-                last_end = end  # update for next segment
-
-            # report chunk progress
-            try:
-                print(f"PROGRESS_CHUNK: {i}/{total_chunks}", flush=True)
-            except Exception:
-                pass
-
-            cumulative += durations[i-1]
-
-        stitched = {'segments': all_segments}
-        max_chars = int(os.environ.get('AUTOCAPTIONS_MAXCHARS', '15'))
-        out_dir = os.environ.get('AUTOCAPTIONS_OUTDIR', TRANSCRIPTIONS_DIR)
-        return save_srt(stitched, out_dir, mp4_file, line_mode=line_mode, max_chars=max_chars)
-    finally:
-        try:
-            shutil.rmtree(tmpdir)
-        except Exception:
-            pass
-
-# === Step 6: Main ===
-def main():
-    if len(sys.argv) < 2:
-        raise ValueError("Usage: python AutoCaptions.py <path_to_mp4> [--mode normal|line]")
-
-    mp4_file = sys.argv[1]
-    if not os.path.isfile(mp4_file):
-        raise FileNotFoundError(f"File not found: {mp4_file}")
-
-    # Default mode is normal (not forced to line)
-    line_mode = False
-
-    # First honor environment variable set by GUI: AUTOCAPTIONS_MODE='line'
-    if os.environ.get('AUTOCAPTIONS_MODE', '').lower() == 'line':
-        line_mode = True
-
-    # simple arg parsing for --mode and optional --max-chars; CLI overrides env
-    if '--mode' in sys.argv:
-        try:
-            mode_idx = sys.argv.index('--mode')
-            mode_val = sys.argv[mode_idx + 1].lower()
-            if mode_val == 'line':
-                line_mode = True
-            else:
-                line_mode = False
-        except Exception:
-            pass
-
-    if '--max-chars' in sys.argv:
-        try:
-            max_idx = sys.argv.index('--max-chars')
-            os.environ['AUTOCAPTIONS_MAXCHARS'] = str(int(sys.argv[max_idx + 1]))
-        except Exception:
-            pass
-
-    mp4_to_srt(mp4_file, line_mode=line_mode)
-
-if __name__ == "__main__":
-    try:
-        main()
-    except Exception as e:
-        # Print the error and exit with non-zero code when running as script
-        print(f"ERROR: {e}")
-        sys.exit(1)
+# -*- coding: utf-8 -*-
+import os
+import sys
+import subprocess
+import shutil
+
+# Try to ensure stdout/stderr use UTF-8 where possible to avoid UnicodeEncodeError on Windows
+try:
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    sys.stderr.reconfigure(encoding='utf-8', errors='replace')
+except Exception:
+    pass
+os.environ.setdefault('PYTHONIOENCODING', 'utf-8')
+
+# === Configuration ===
+import pathlib
+
+# support running from a frozen bundle (PyInstaller)
+if getattr(sys, 'frozen', False):
+    # when frozen, resources are unpacked to sys._MEIPASS
+    BASE_DIR = pathlib.Path(sys._MEIPASS)
+else:
+    BASE_DIR = pathlib.Path(__file__).resolve().parent
+
+SCRIPT_DIR = str(BASE_DIR)
+FFMPEG_EXE = os.path.join(SCRIPT_DIR, "ffmpeg.exe")
+FFMPEG_DIR = os.path.dirname(FFMPEG_EXE)
+# allow overriding output dir via env, otherwise use a transcriptions folder next to the script
+TRANSCRIPTIONS_DIR = os.environ.get('AUTOCAPTIONS_OUTDIR', str(pathlib.Path(SCRIPT_DIR) / 'transcriptions'))
+
+# one default wrap width for every save_srt call site; the cached re-run of a
+# file must wrap identically to the run that produced the cache entry
+DEFAULT_MAX_CHARS = 15
+
+# === Step 1: Verify ffmpeg exists ===
+if not os.path.isfile(FFMPEG_EXE):
+    # if ffmpeg not bundled, rely on PATH ffmpeg if available
+    try:
+        subprocess.run(["ffmpeg", "-version"], check=True, capture_output=True)
+        FFMPEG_EXE = "ffmpeg"
+        FFMPEG_DIR = os.path.dirname(shutil.which(FFMPEG_EXE) or "")
+    except Exception:
+        raise RuntimeError(f"ffmpeg.exe not found at {FFMPEG_EXE} and no ffmpeg on PATH")
+
+os.environ["PATH"] = FFMPEG_DIR + os.pathsep + os.environ["PATH"]
+
+# === Step 2: Import Whisper ===
+try:
+    import whisper
+except ModuleNotFoundError:
+    raise ModuleNotFoundError("Whisper is not installed in this Python environment.")
+
+import functools
+import threading
+import numpy as np
+
+# single writer for progress lines: preformatted bytes straight to the stdout
+# buffer skip the text codec and newline translation, and the lock keeps
+# parallel chunk workers from interleaving partial lines
+_OUT_LOCK = threading.Lock()
+
+# openai-whisper is not safe for concurrent transcribe calls: decoding
+# registers kv-cache forward hooks on the shared decoder modules, so two
+# in-flight decodes corrupt each other's caches. This lock serializes them.
+_MODEL_LOCK = threading.Lock()
+
+
+def _emit(msg):
+    """Write one line to stdout, as raw UTF-8 bytes when possible."""
+    out = sys.stdout
+    buf = getattr(out, 'buffer', None)
+    try:
+        with _OUT_LOCK:
+            if buf is not None:
+                buf.write((msg + "\n").encode("utf-8", "replace"))
+                buf.flush()
+            else:
+                # GUI inline mode swaps in a catcher without a buffer; fall
+                # back to its text interface so progress still reaches the log
+                out.write(msg + "\n")
+                out.flush()
+    except Exception:
+        pass
+
+# optional faster-whisper backend (CTranslate2 quantized kernels); enabled
+# with AUTOCAPTIONS_BACKEND=faster when the package is installed
+try:
+    from faster_whisper import WhisperModel as _FasterWhisperModel
+except Exception:
+    _FasterWhisperModel = None
+
+
+def _default_device():
+    try:
+        import torch
+        return 'cuda' if torch.cuda.is_available() else 'cpu'
+    except Exception:
+        return 'cpu'
+
+# transcription device: detected once, overridable with AUTOCAPTIONS_DEVICE=cpu
+# for machines with flaky GPU drivers
+DEVICE = os.environ.get('AUTOCAPTIONS_DEVICE') or _default_device()
+
+
+@functools.lru_cache(maxsize=2)
+def _get_model(model_name, backend='whisper'):
+    """Load a transcription model once and reuse it across calls.
+
+    Loading costs several seconds per call, so long-running GUI or batch
+    sessions should not pay it repeatedly. Call _get_model.cache_clear()
+    to release cached models under memory pressure.
+    """
+    if backend == 'faster' and _FasterWhisperModel is not None:
+        return _FasterWhisperModel(
+            model_name,
+            device=DEVICE,
+            compute_type=os.environ.get('AUTOCAPTIONS_COMPUTE', 'int8'),
+            cpu_threads=os.cpu_count() or 1,
+        )
+    return whisper.load_model(model_name, device=DEVICE)
+
+
+def _transcribe_kwargs():
+    """Decoding knobs shared by every transcription call.
+
+    Greedy decoding without cross-chunk conditioning is several times
+    faster than whisper's defaults (beam of 5 plus a temperature fallback
+    ladder) for a small quality trade-off. AUTOCAPTIONS_BEAM re-enables a
+    wider beam and AUTOCAPTIONS_LANG pins the language when quality
+    matters more than speed.
+    """
+    kw = dict(
+        word_timestamps=True,
+        condition_on_previous_text=False,
+        temperature=0.0,
+        beam_size=int(os.environ.get('AUTOCAPTIONS_BEAM', '1')),
+        no_speech_threshold=0.6,
+        fp16=(DEVICE == 'cuda'),
+    )
+    lang = os.environ.get('AUTOCAPTIONS_LANG')
+    if lang:
+        kw['language'] = lang
+    return kw
+
+
+def _transcribe(model, audio, **kwargs):
+    """Transcribe audio and return openai-whisper's result dict shape.
+
+    faster-whisper yields segment objects lazily, so convert them to the
+    {"segments": [{start, end, text, words: [...]}]} dicts save_srt expects.
+    """
+    if _FasterWhisperModel is not None and isinstance(model, _FasterWhisperModel):
+        # precision is governed by compute_type in CTranslate2, not fp16
+        kwargs.pop('fp16', None)
+        seg_iter, _info = model.transcribe(audio, vad_filter=True, **kwargs)
+        segments = []
+        for seg in seg_iter:
+            words = [{'word': w.word, 'start': w.start, 'end': w.end}
+                     for w in (seg.words or [])]
+            segments.append({'start': seg.start, 'end': seg.end,
+                             'text': seg.text, 'words': words})
+        return {'segments': segments}
+    # serialize openai-whisper decodes (see _MODEL_LOCK); holding the lock
+    # also guarantees the CPU-fallback move below never happens while another
+    # thread is decoding on the shared model
+    with _MODEL_LOCK:
+        try:
+            return model.transcribe(audio, **kwargs)
+        except RuntimeError:
+            # typically CUDA OOM or a flaky driver; retry once on CPU instead
+            # of failing the whole run (the cached model stays on CPU after)
+            if DEVICE != 'cuda' or not hasattr(model, 'to'):
+                raise
+            model.to('cpu')
+            kwargs['fp16'] = False
+            return model.transcribe(audio, **kwargs)
+
+# Whisper expects mono 16 kHz input; all decoded audio uses this rate
+SAMPLE_RATE = 16000
+
+
+def _decode_audio(mp4_file, total_duration=None):
+    """Decode the input to a mono 16 kHz float32 NumPy array in one ffmpeg pass.
+
+    Decoding once to memory avoids writing per-chunk wav files to disk and
+    re-parsing their headers; chunks become cheap array slices instead.
+    stderr is drained by a reader thread (so ffmpeg can never stall on a
+    full pipe) which also parses -progress output and emits
+    PROGRESS_FFMPEG lines when total_duration is known.
+    """
+    decode_cmd = [
+        'ffmpeg', '-y', '-i', mp4_file,
+        '-vn', '-ac', '1', '-ar', str(SAMPLE_RATE),
+        '-progress', 'pipe:2', '-nostats',
+        '-f', 's16le', '-acodec', 'pcm_s16le', '-'
+    ]
+    proc = subprocess.Popen(decode_cmd, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, bufsize=1 << 20)
+
+    total_ms = int(total_duration * 1000) if total_duration else 0
+
+    def _pump_progress(stream):
+        try:
+            for line in stream:
+                if total_ms and line.startswith(b'out_time_ms='):
+                    try:
+                        # despite the name, ffmpeg reports this in microseconds
+                        out_ms = int(line.split(b'=', 1)[1]) // 1000
+                        pct = min(100, out_ms * 100 // total_ms)
+                        _emit(f"PROGRESS_FFMPEG: {pct}/100")
+                    except Exception:
+                        pass
+        except Exception:
+            pass
+
+    threading.Thread(target=_pump_progress, args=(proc.stderr,), daemon=True).start()
+    raw = proc.stdout.read()
+    rc = proc.wait()
+    if rc != 0 or not raw:
+        raise RuntimeError(f"ffmpeg failed to decode audio from {mp4_file} (exit code {rc})")
+    return np.frombuffer(raw, np.int16).astype(np.float32) / 32768.0
+
+
+@functools.lru_cache(maxsize=1)
+def _load_vad():
+    """Load the Silero VAD model once via torch.hub (may download on first use)."""
+    import torch
+    model, utils = torch.hub.load('snakers4/silero-vad', 'silero_vad', trust_repo=True)
+    get_speech_timestamps = utils[0]
+    return model, get_speech_timestamps
+
+
+def _vad_chunks(audio, chunk_seconds):
+    """Split audio on detected silences into (offset_seconds, slice) chunks.
+
+    Speech intervals from Silero VAD are greedily packed into chunks of at
+    most chunk_seconds, so splits land in silence instead of mid-word and
+    silent stretches are never decoded. Chunk edges are padded slightly
+    into the surrounding silence for decoder context without overlapping
+    neighbouring speech.
+    """
+    import torch
+    vad_model, get_speech_timestamps = _load_vad()
+    speech = get_speech_timestamps(torch.from_numpy(audio), vad_model,
+                                   sampling_rate=SAMPLE_RATE)
+    if not speech:
+        return []
+
+    max_samples = chunk_seconds * SAMPLE_RATE
+    # split any single speech run longer than a chunk at hard boundaries
+    intervals = []
+    for iv in speech:
+        s, e = iv['start'], iv['end']
+        while e - s > max_samples:
+            intervals.append((s, s + max_samples))
+            s += max_samples
+        intervals.append((s, e))
+
+    # greedily pack consecutive intervals into chunks of <= max_samples
+    packed = []
+    cur_s, cur_e = intervals[0]
+    for s, e in intervals[1:]:
+        if e - cur_s <= max_samples:
+            cur_e = e
+        else:
+            packed.append((cur_s, cur_e))
+            cur_s, cur_e = s, e
+    packed.append((cur_s, cur_e))
+
+    # pad edges by up to half a second of silence, clamped to the neighbours
+    pad = SAMPLE_RATE // 2
+    chunks = []
+    prev_end = 0
+    for idx, (s, e) in enumerate(packed):
+        next_start = packed[idx + 1][0] if idx + 1 < len(packed) else len(audio)
+        s = max(prev_end, s - pad)
+        e = min(next_start, e + pad, len(audio))
+        prev_end = e
+        chunks.append((s / float(SAMPLE_RATE), audio[s:e]))
+    return chunks
+
+
+def _cache_path_for(mp4_file, model_name):
+    """Return the sidecar cache path for this file/model pair, or None.
+
+    The key hashes mtime, size and model name, so editing the video or
+    switching models naturally misses while formatting-only re-runs hit.
+    """
+    try:
+        import hashlib
+        st = os.stat(mp4_file)
+        key = hashlib.sha1(f"{st.st_mtime_ns}-{st.st_size}-{model_name}".encode()).hexdigest()[:16]
+        base_name = os.path.splitext(os.path.basename(mp4_file))[0]
+        cache_dir = os.path.join(os.environ.get('AUTOCAPTIONS_OUTDIR', TRANSCRIPTIONS_DIR), '.cache')
+        return os.path.join(cache_dir, f"{base_name}.{key}.json")
+    except Exception:
+        return None
+
+
+def _load_cached_result(cache_path):
+    """Load a previously cached raw transcription, or None on any failure."""
+    if not cache_path or not os.path.isfile(cache_path):
+        return None
+    try:
+        import json
+        with open(cache_path, 'r', encoding='utf-8') as cf:
+            return json.load(cf)
+    except Exception:
+        return None
+
+
+def _store_cached_result(cache_path, result):
+    """Persist a raw transcription result for reuse on re-runs."""
+    if not cache_path:
+        return
+    try:
+        import json
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp = cache_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as cf:
+            json.dump(result, cf, separators=(',', ':'))
+        # atomic replace so concurrent GUI launches never read a partial file
+        os.replace(tmp, cache_path)
+    except Exception:
+        pass
+
+
+def _probe_duration(mp4_file):
+    """Return the container duration in seconds via one ffprobe call, or None.
+
+    One probe replaces any per-chunk duration bookkeeping and gives later
+    steps (progress reporting, sanity checks) a total to work against.
+    """
+    try:
+        probe = subprocess.run(
+            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+             '-of', 'default=nw=1:nk=1', mp4_file],
+            capture_output=True, text=True)
+        return float(probe.stdout.strip())
+    except Exception:
+        return None
+
+
+def _shift_timestamps(segs, offset, extra_delay=0.0):
+    """Return fresh copies of segs with start/end shifted by offset.
+
+    Building new dicts in a single comprehension pass beats mutating every
+    entry in place (one dict construction versus several getitem/setitem
+    round trips per segment and word) and leaves the model's own output
+    untouched. Missing end times stay None for the stitcher to handle.
+    """
+    def _shift(seg):
+        shifted = {
+            **seg,
+            'start': seg.get('start', 0.0) + offset,
+            'end': (seg['end'] + offset + extra_delay) if seg.get('end') is not None else None,
+        }
+        words = seg.get('words')
+        if words:
+            shifted['words'] = [
+                {**w,
+                 **({'start': w['start'] + offset} if w.get('start') is not None else {}),
+                 **({'end': w['end'] + offset} if w.get('end') is not None else {})}
+                for w in words
+            ]
+        return shifted
+
+    return [_shift(seg) for seg in segs]
+
+# === Step 3: Helper function to wrap text for line mode ===
+def wrap_text_line_mode(text, max_chars):
+    # collect words per line and join once at flush time; building the line
+    # with += would copy the whole buffer on every word (O(len^2))
+    lines = []
+    current_words = []
+    current_len = 0
+    for word in text.split():
+        add_len = len(word) + (1 if current_len else 0)
+        if current_len + add_len <= max_chars:
+            current_words.append(word)
+            current_len += add_len
+        else:
+            lines.append(" ".join(current_words))
+            current_words = [word]
+            current_len = len(word)
+    if current_words:
+        lines.append(" ".join(current_words))
+    return lines
+
+
+def split_words_into_lines(words, max_chars=20):
+    """Group whisper word-timestamp dicts into lines of ~max_chars and return
+    a list of dicts with text/start/end for each line. If words is empty,
+    return an empty list.
+    """
+    if not words:
+        return []
+
+    lines = []
+    current_words = []
+    current_texts = []  # stripped tokens kept alongside so flush doesn't re-strip
+    current_len = 0
+
+    def flush_current():
+        nonlocal current_words, current_texts, current_len
+        if not current_words:
+            return
+        text = " ".join(current_texts)
+        start = current_words[0].get("start")
+        # Use the last word's end timestamp so the caption end is after the last word
+        end = current_words[-1].get("end")
+        lines.append({"text": text, "start": start, "end": end})
+        current_words = []
+        current_texts = []
+        current_len = 0
+
+    for w in words:
+        word_text = w.get("word", "").strip()
+        # treat empty tokens as skipped
+        if not word_text:
+            continue
+        add_len = len(word_text) + (1 if current_len else 0)
+        if current_len + add_len <= max_chars:
+            current_words.append(w)
+            current_texts.append(word_text)
+            current_len += add_len
+        else:
+            flush_current()
+            current_words.append(w)
+            current_texts.append(word_text)
+            current_len = len(word_text)
+
+    flush_current()
+    return lines
+
+# === Step 4: Save SRT ===
+def save_srt(result, output_dir, mp4_file, line_mode=False, max_chars=20):
+    os.makedirs(output_dir, exist_ok=True)
+    base_name = os.path.splitext(os.path.basename(mp4_file))[0]
+    srt_path = os.path.join(output_dir, base_name + ".srt")
+
+    index = 1
+
+    # compute total number of captions that will be emitted so GUI can report
+    # progress; keep the reflowed lines so the emit loop doesn't redo the work
+    total_captions = 0
+    per_segment_lines = []
+    if line_mode:
+        for segment in result.get("segments", []):
+            words = segment.get("words") or []
+            word_lines = split_words_into_lines(words, max_chars=max_chars)
+            if word_lines:
+                text_lines = None
+                total_captions += len(word_lines)
+            else:
+                text = segment.get("text", "").strip()
+                text_lines = wrap_text_line_mode(text, max_chars=max_chars)
+                total_captions += max(1, len(text_lines))
+            per_segment_lines.append((word_lines, text_lines))
+    else:
+        total_captions = len(result.get("segments", []))
+
+    # padding (in seconds) applied to caption end times to avoid cutting words early
+    padding = float(os.environ.get('AUTOCAPTIONS_PADDING', '0.08'))
+    # minimum gap between consecutive captions (seconds) to avoid small overlaps
+    min_gap = float(os.environ.get('AUTOCAPTIONS_MIN_GAP', '0.01'))
+    # minimum duration for a caption (seconds)
+    min_dur = float(os.environ.get('AUTOCAPTIONS_MIN_DUR', '0.05'))
+
+    def format_time(seconds):
+        # guard against None
+        if seconds is None:
+            seconds = 0.0
+        # round to nearest millisecond to avoid truncation that can cut off audio
+        total_ms = int(round(seconds * 1000))
+        total_seconds, ms = divmod(total_ms, 1000)
+        m, s = divmod(total_seconds, 60)
+        h, m = divmod(m, 60)
+        return f"{h:02}:{m:02}:{s:02},{ms:03}"
+
+    # coalesce progress output: one print per caption means tens of
+    # thousands of flushed writes on long videos, far beyond what the GUI
+    # can display anyway. Emit at most ~20 updates/sec plus the final tick.
+    from time import monotonic
+    last_emit = 0.0
+
+    def _emit_progress(idx, total):
+        nonlocal last_emit
+        now = monotonic()
+        if now - last_emit >= 0.05 or idx >= total:
+            last_emit = now
+            _emit(f"PROGRESS: {idx}/{total}")
+
+    # stream caption blocks straight to the file instead of accumulating a
+    # lines list and joining at the end; a large buffer keeps writes cheap.
+    # Binary mode keeps spec-compliant LF newlines and skips the text-layer
+    # re-encode and CRLF translation Windows would otherwise apply.
+    # the context manager guarantees the handle closes on any mid-loop
+    # failure; a lingering open handle keeps the half-written .srt locked
+    # against a retry on Windows
+    with open(srt_path, "wb", buffering=1 << 20) as srt_file:
+
+        for seg_i, segment in enumerate(result["segments"]):
+            seg_start = segment.get("start")
+            seg_end = segment.get("end")
+            text = segment.get("text", "").strip()
+
+            if line_mode:
+                # Prefer using word timestamps to assign times per small line;
+                # the reflow was already computed in the counting pass above
+                word_lines, counted_text_lines = per_segment_lines[seg_i]
+
+                if word_lines:
+                    for wl in word_lines:
+                        start = wl.get("start", seg_start)
+                        end = wl.get("end", seg_end)
+                        # apply small padding to end times so words aren't cut off early
+                        if end is not None:
+                            end = end + padding
+                        # avoid producing an end earlier than start due to rounding
+                        if start is not None and end is not None and end <= start:
+                            end = start + 0.001
+                        text_line = wl.get("text", "")
+                        # enforce minimum duration
+                        if end is not None and start is not None and (end - start) < min_dur:
+                            end = start + min_dur
+                        # ensure we don't overlap prior caption: use the last_end variable if set
+                        try:
+                            if 'last_srt_end' in locals():
+                                if start is not None and start < last_srt_end + min_gap:
+                                    start = last_srt_end + min_gap
+                                    if end is not None and end <= start:
+                                        end = start + min_dur
+                        except Exception:
+                            pass
+
+                        srt_file.write(f"{index}\n{format_time(start)} --> {format_time(end)}\n{text_line}\n\n".encode("utf-8"))
+                        # track the end of the last written caption for gap enforcement
+                        try:
+                            last_srt_end = end if end is not None else start
+                        except Exception:
+                            last_srt_end = end
+                        # emit progress so UI can parse it
+                        _emit_progress(index, total_captions)
+                        index += 1
+                else:
+                    # fallback: split raw text and evenly distribute times across lines
+                    text_lines = counted_text_lines if counted_text_lines is not None else wrap_text_line_mode(text, max_chars=max_chars)
+                    n = max(1, len(text_lines))
+                    seg_dur = (seg_end - seg_start) if (seg_start is not None and seg_end is not None) else 0
+                    for idx, tline in enumerate(text_lines):
+                        if seg_dur > 0:
+                            start = seg_start + (seg_dur * idx / n)
+                            end = seg_start + (seg_dur * (idx + 1) / n)
+                            # pad fallback-distributed lines as well
+                            if end is not None:
+                                end = end + padding
+                        else:
+                            start = seg_start or 0
+                            end = seg_end or start
+                        # enforce minimum duration
+                        if end is not None and start is not None and (end - start) < min_dur:
+                            end = start + min_dur
+                        # prevent tiny overlap with previous caption
+                        try:
+                            if 'last_srt_end' in locals() and start is not None and start < last_srt_end + min_gap:
+                                start = last_srt_end + min_gap
+                                if end is not None and end <= start:
+                                    end = start + min_dur
+                        except Exception:
+                            pass
+
+                        srt_file.write(f"{index}\n{format_time(start)} --> {format_time(end)}\n{tline}\n\n".encode("utf-8"))
+                        try:
+                            last_srt_end = end if end is not None else start
+                        except Exception:
+                            last_srt_end = end
+                        _emit_progress(index, total_captions)
+                        index += 1
+            else:
+                # normal mode: one caption per segment
+                # enforce min dur and gap for normal mode too
+                start = seg_start
+                end = seg_end
+                if end is not None and start is not None and (end - start) < min_dur:
+                    end = start + min_dur
+                try:
+                    if 'last_srt_end' in locals() and start is not None and start < last_srt_end + min_gap:
+                        start = last_srt_end + min_gap
+                        if end is not None and end <= start:
+                            end = start + min_dur
+                except Exception:
+                    pass
+                srt_file.write(f"{index}\n{format_time(start)} --> {format_time(end)}\n{text}\n\n".encode("utf-8"))
+                _emit_progress(index, total_captions)
+                index += 1
+
+
+    _emit(f"SRT file saved to: {srt_path}")
+    return srt_path
+
+# === Step 5: Transcribe MP4 ===
+def mp4_to_srt(mp4_file, line_mode=False):
+    import concurrent.futures
+
+    _emit(f"Transcribing {mp4_file} ... this may take a while")
+    model_name = os.environ.get('AUTOCAPTIONS_MODEL', 'small')
+    backend = os.environ.get('AUTOCAPTIONS_BACKEND', 'whisper')
+    # allow CLI --model
+    if '--model' in sys.argv:
+        try:
+            m_idx = sys.argv.index('--model')
+            model_name = sys.argv[m_idx + 1]
+        except Exception:
+            pass
+
+    # chunking config (seconds)
+    chunk_seconds = int(os.environ.get('AUTOCAPTIONS_CHUNK_SECONDS', '30'))
+
+    # reuse a cached raw transcription when the file and model are unchanged,
+    # so formatting-only re-runs (e.g. toggling line mode) skip decode and
+    # transcription entirely; disable with AUTOCAPTIONS_CACHE=0
+    cache_path = None
+    if os.environ.get('AUTOCAPTIONS_CACHE', '1') != '0':
+        cache_path = _cache_path_for(mp4_file, model_name)
+        cached = _load_cached_result(cache_path)
+        if cached is not None:
+            _emit("Using cached transcription (delete the .cache sidecar to force a re-run)")
+            max_chars = int(os.environ.get('AUTOCAPTIONS_MAXCHARS', DEFAULT_MAX_CHARS))
+            out_dir = os.environ.get('AUTOCAPTIONS_OUTDIR', TRANSCRIPTIONS_DIR)
+            return save_srt(cached, out_dir, mp4_file, line_mode=line_mode, max_chars=max_chars)
+
+    # probe the total duration once up front (progress totals, sanity check)
+    total_duration = _probe_duration(mp4_file)
+
+    # decode the whole file once; chunks are array slices, no temp files needed
+    try:
+        audio = _decode_audio(mp4_file, total_duration=total_duration)
+        # a decode much shorter than the container duration means truncated
+        # audio; surface it in the log rather than silently captioning less
+        if total_duration and abs(len(audio) / float(SAMPLE_RATE) - total_duration) > 1.0:
+            _emit(f"WARNING: decoded {len(audio) / float(SAMPLE_RATE):.1f}s of audio "
+                  f"but container reports {total_duration:.1f}s")
+    except Exception:
+        # if decoding fails, fallback to letting whisper load the file itself
+        model = _get_model(model_name, backend)
+        result = _transcribe(model, mp4_file, **_transcribe_kwargs())
+        _store_cached_result(cache_path, result)
+        max_chars = int(os.environ.get('AUTOCAPTIONS_MAXCHARS', DEFAULT_MAX_CHARS))
+        out_dir = os.environ.get('AUTOCAPTIONS_OUTDIR', TRANSCRIPTIONS_DIR)
+        return save_srt(result, out_dir, mp4_file, line_mode=line_mode, max_chars=max_chars)
+
+    # chunk on real silences when VAD is available; AUTOCAPTIONS_VAD=0 or a
+    # VAD load failure falls back to fixed-size slicing
+    chunk_samples = chunk_seconds * SAMPLE_RATE
+    chunks = []
+    if os.environ.get('AUTOCAPTIONS_VAD', '1') != '0':
+        try:
+            chunks = _vad_chunks(audio, chunk_seconds)
+        except Exception:
+            chunks = []
+    if not chunks:
+        chunks = [(off / float(SAMPLE_RATE), audio[off:off + chunk_samples])
+                  for off in range(0, len(audio), chunk_samples)]
+    if len(chunks) <= 1:
+        # single chunk, transcribe normally
+        model = _get_model(model_name, backend)
+        result = _transcribe(model, audio, **_transcribe_kwargs())
+        _store_cached_result(cache_path, result)
+        max_chars = int(os.environ.get('AUTOCAPTIONS_MAXCHARS', DEFAULT_MAX_CHARS))
+        out_dir = os.environ.get('AUTOCAPTIONS_OUTDIR', TRANSCRIPTIONS_DIR)
+        return save_srt(result, out_dir, mp4_file, line_mode=line_mode, max_chars=max_chars)
+
+    # multi-chunk: transcribe each and stitch results
+    model = _get_model(model_name, backend)
+    all_segments = []
+    total_chunks = len(chunks)
+
+    # use padding env if provided; fallback to small value
+    extra_delay = float(os.environ.get('AUTOCAPTIONS_PADDING', '0.08'))
+
+    # number of parallel transcription workers. Chunks are independent after
+    # splitting, but only CTranslate2 (faster-whisper) supports concurrent
+    # decodes on one model; openai-whisper serializes on _MODEL_LOCK, so
+    # extra workers would only sit blocked on it
+    if _FasterWhisperModel is not None and isinstance(model, _FasterWhisperModel):
+        try:
+            max_workers = int(os.environ.get('AUTOCAPTIONS_PARALLEL', max(1, (os.cpu_count() or 2) // 2)))
+        except Exception:
+            max_workers = 1
+    else:
+        max_workers = 1
+    max_workers = max(1, min(max_workers, total_chunks))
+
+    def _transcribe_chunk(i, chunk, offset):
+        # transcribe one chunk and shift its timestamps by the chunk offset
+        if max_workers > 1:
+            try:
+                # avoid thread oversubscription when several workers share the CPU
+                import torch
+                torch.set_num_threads(1)
+            except Exception:
+                pass
+        chunk_result = _transcribe(model, chunk, **_transcribe_kwargs())
+        segs = _shift_timestamps(chunk_result.get('segments', []), offset, extra_delay)
+        return i, segs
+
+    results = {}
+    done_count = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_transcribe_chunk, i, chunk, offset): i
+            for i, (offset, chunk) in enumerate(chunks, start=1)
+        }
+        for fut in concurrent.futures.as_completed(futures):
+            i, segs = fut.result()
+            results[i] = segs
+            done_count += 1
+            # report chunk progress (completion order, count is monotonic)
+            _emit(f"PROGRESS_CHUNK: {done_count}/{total_chunks}")
+
+    # concatenate in ascending chunk order and fix up overlaps sequentially
+    last_end = 0.0  # keep track of the last segment end time
+    for i in range(1, total_chunks + 1):
+        for seg in results.get(i, []):
+            start = seg.get('start', 0.0)
+            end = seg.get('end', None)
+            if end is None:
+                # fallback to a small duration if end is missing
+                end = start + 0.3
+
+            # prevent overlap with previous segment
+            if start < last_end:
+                start = last_end + 0.01  # ensure at least 10ms gap
+            if end <= start:
+                end = start + 0.3  # ensure caption is visible for a minimum duration
+
+            seg['start'] = start
+            seg['end'] = end
+            all_segments.append(seg)
+            last_end = end  # update for next segment
+
+    stitched = {'segments': all_segments}
+    _store_cached_result(cache_path, stitched)
+    max_chars = int(os.environ.get('AUTOCAPTIONS_MAXCHARS', DEFAULT_MAX_CHARS))
+    out_dir = os.environ.get('AUTOCAPTIONS_OUTDIR', TRANSCRIPTIONS_DIR)
+    return save_srt(stitched, out_dir, mp4_file, line_mode=line_mode, max_chars=max_chars)
+
+# === Step 6: Main ===
+def serve():
+    """Long-running job server: one JSON job per stdin line.
+
+    Keeps the interpreter (and the cached Whisper model) resident between
+    jobs, so a GUI that submits repeatedly skips python startup, imports
+    and the multi-second model load after the first run. Each job is a
+    dict like {"video": ..., "mode": "line", "max_chars": 15,
+    "model": "small", "out_dir": ...}; JOB_DONE: <code> is emitted when a
+    job finishes so the caller can track completion.
+    """
+    import json
+
+    _emit("SERVER_READY")
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            job = json.loads(line)
+        except Exception as e:
+            _emit(f"ERROR: bad job line: {e}")
+            _emit("JOB_DONE: 1")
+            continue
+        try:
+            if job.get('model'):
+                os.environ['AUTOCAPTIONS_MODEL'] = str(job['model'])
+            if job.get('max_chars'):
+                os.environ['AUTOCAPTIONS_MAXCHARS'] = str(job['max_chars'])
+            if job.get('out_dir'):
+                os.environ['AUTOCAPTIONS_OUTDIR'] = str(job['out_dir'])
+            line_mode = str(job.get('mode', '')).lower() == 'line'
+            mp4_to_srt(job['video'], line_mode=line_mode)
+            _emit("JOB_DONE: 0")
+        except Exception as e:
+            _emit(f"ERROR: {e}")
+            _emit("JOB_DONE: 1")
+
+
+def main():
+    # server mode keeps this process warm for repeated jobs (used by the GUI)
+    if '--server' in sys.argv:
+        serve()
+        return
+
+    if len(sys.argv) < 2:
+        raise ValueError("Usage: python AutoCaptions.py <path_to_mp4> [--mode normal|line] [--server]")
+
+    mp4_file = sys.argv[1]
+    if not os.path.isfile(mp4_file):
+        raise FileNotFoundError(f"File not found: {mp4_file}")
+
+    # Default mode is normal (not forced to line)
+    line_mode = False
+
+    # First honor environment variable set by GUI: AUTOCAPTIONS_MODE='line'
+    if os.environ.get('AUTOCAPTIONS_MODE', '').lower() == 'line':
+        line_mode = True
+
+    # simple arg parsing for --mode and optional --max-chars; CLI overrides env
+    if '--mode' in sys.argv:
+        try:
+            mode_idx = sys.argv.index('--mode')
+            mode_val = sys.argv[mode_idx + 1].lower()
+            if mode_val == 'line':
+                line_mode = True
+            else:
+                line_mode = False
+        except Exception:
+            pass
+
+    if '--max-chars' in sys.argv:
+        try:
+            max_idx = sys.argv.index('--max-chars')
+            os.environ['AUTOCAPTIONS_MAXCHARS'] = str(int(sys.argv[max_idx + 1]))
+        except Exception:
+            pass
+
+    mp4_to_srt(mp4_file, line_mode=line_mode)
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        # Print the error and exit with non-zero code when running as script
+        print(f"ERROR: {e}")
+        sys.exit(1)
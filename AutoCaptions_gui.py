@@ -1,559 +1,1088 @@
-import os
-import sys
-import subprocess
-import threading
-import time
-from PySide6.QtGui import QTextCursor, QIcon  # add this at the top
-from PySide6 import QtCore, QtWidgets
-from PySide6.QtWidgets import (
-    QApplication,
-    QWidget,
-    QLabel,
-    QLineEdit,
-    QPushButton,
-    QFileDialog,
-    QHBoxLayout,
-    QVBoxLayout,
-    QTextEdit,
-    QRadioButton,
-    QProgressBar,
-    QComboBox,
-    QSpinBox,
-    QMessageBox
-)
-
-from PySide6.QtGui import QIcon
-
-def resource_path(relative_path):
-    """Get absolute path to resource ."""
-    try:
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
-
-
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-AUTOCAPTIONS_SCRIPT = os.path.join(SCRIPT_DIR, 'AutoCaptions.py')
-DEFAULT_OUT = os.path.join(SCRIPT_DIR, 'transcriptions')
-os.makedirs(DEFAULT_OUT, exist_ok=True)  # Ensure default folder exists
-
-# Try a direct import so PyInstaller detects the module during analysis
-_STATIC_MP4_TO_SRT = None
-try:
-    import AutoCaptions as _auto_mod
-    _STATIC_MP4_TO_SRT = getattr(_auto_mod, 'mp4_to_srt', None)
-except Exception:
-    _STATIC_MP4_TO_SRT = None
-
-
-class Worker(QtCore.QThread):
-    log_line = QtCore.Signal(str)
-    finished = QtCore.Signal(int)
-
-    def __init__(self, target_func, args=()):
-        super().__init__()
-        self.target_func = target_func
-        self.args = args
-        self._stop_requested = False
-
-    def run(self):
-        # Run the target function and capture stdout prints by temporarily redirecting sys.stdout
-        import sys
-        import io
-
-        class StreamCatcher:
-            def __init__(self, emit):
-                self.emit = emit
-            def write(self, s):
-                if s:
-                    self.emit(s)
-            def flush(self):
-                pass
-
-        real_stdout = sys.stdout
-        catcher = StreamCatcher(lambda s: self.log_line.emit(s))
-        sys.stdout = catcher
-        try:
-            try:
-                # Call the transcription function which prints progress lines
-                self.target_func(*self.args)
-                ret = 0
-            except Exception as e:
-                import traceback
-                self.log_line.emit(f"Error in worker: {e}\n")
-                self.log_line.emit(traceback.format_exc())
-                ret = 1
-        finally:
-            sys.stdout = real_stdout
-            self.finished.emit(ret)
-
-    def stop(self):
-        # mp4_to_srt is not cancelable easily; we set a flag in case we add support later
-        self._stop_requested = True
-
-
-class SubprocessWorker(QtCore.QThread):
-    """Run the backend script via an external Python executable and stream stdout to the GUI."""
-    log_line = QtCore.Signal(str)
-    finished = QtCore.Signal(int)
-
-    def __init__(self, python_exe, script_path, args=None, env=None):
-        super().__init__()
-        self.python_exe = python_exe
-        self.script_path = script_path
-        self.args = args or []
-        self.env = env or os.environ.copy()
-        self._proc = None
-
-    def run(self):
-        cmd = [self.python_exe, self.script_path] + self.args
-        try:
-            # start subprocess and stream stdout line-by-line
-            # On Windows, avoid showing a new console window for the child process.
-            startupinfo = None
-            creationflags = 0
-            if sys.platform.startswith('win'):
-                try:
-                    startupinfo = subprocess.STARTUPINFO()
-                    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                    startupinfo.wShowWindow = subprocess.SW_HIDE
-                    # CREATE_NO_WINDOW prevents a console from being created
-                    creationflags = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
-                except Exception:
-                    startupinfo = None
-            # Open subprocess with explicit text encoding and replace errors so non-decodable bytes don't raise
-            try:
-                self._proc = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    env=self.env,
-                    text=True,
-                    encoding='utf-8',
-                    errors='replace',
-                    startupinfo=startupinfo,
-                    creationflags=creationflags,
-                )
-            except TypeError:
-                # Older Python may not support encoding/errors parameters with Popen; fall back to text mode
-                self._proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=self.env, text=True, startupinfo=startupinfo, creationflags=creationflags)
-
-            if self._proc.stdout:
-                try:
-                    for line in self._proc.stdout:
-                        # line is a str when text=True; ensure logging never raises
-                        try:
-                            self.log_line.emit(line.rstrip('\n'))
-                        except Exception:
-                            # As a last resort, coerce to str safely
-                            try:
-                                self.log_line.emit(str(line).rstrip('\n'))
-                            except Exception:
-                                pass
-                except Exception as read_exc:
-                    import traceback
-                    self.log_line.emit(f"Error reading backend output: {read_exc}\n")
-                    self.log_line.emit(traceback.format_exc())
-            rc = self._proc.wait()
-        except Exception as e:
-            self.log_line.emit(f"Error launching backend: {e}\n")
-            rc = 1
-        finally:
-            self.finished.emit(rc)
-
-    def stop(self):
-        try:
-            if self._proc and self._proc.poll() is None:
-                self._proc.terminate()
-        except Exception:
-            pass
-
-
-class MainWindow(QWidget):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle('TrueCaptions')
-        self.resize(400, 550)
-
-        # CSS Styling
-        self.setStyleSheet("""
-            QPushButton { font-size: 14px; padding: 6px; }
-            QProgressBar { height: 20px; border: 1px solid #aaa; border-radius: 8px; }
-            QTextEdit { font-family: Consolas; font-size: 12px; background-color: #f5f5f5; color: #000000; }
-            QSpinBox, QComboBox, QLineEdit { font-size: 13px; color: #f5f5f5; }
-            QTextEdit, QLineEdit, QSpinBox, QComboBox { selection-background-color: #3399ff; selection-color: #ffffff; }
-            QLabel { font-weight: bold; }
-        """)
-
-        # Widgets
-        # Determine a sensible default Python executable. When running from a built exe
-        # sys.executable will be the exe itself which is not a usable python interpreter
-        # for creating venvs or running pip. Prefer an explicit short-root build venv
-        # or a project venv, or an env override `AUTOCAPTIONS_PYTHON` if provided.
-        default_python = ''
-        env_py = os.environ.get('AUTOCAPTIONS_PYTHON') or os.environ.get('AUTOCAPTIONS_PYENV')
-        candidates = []
-        if env_py:
-            candidates.append(env_py)
-        # common short-root venv used by build script
-        candidates.append(r'C:\ac_build_venv\Scripts\python.exe')
-        # fallback project-local venvs
-        candidates.append(os.path.join(SCRIPT_DIR, '.build_venv', 'Scripts', 'python.exe'))
-        candidates.append(os.path.join(SCRIPT_DIR, '.venv', 'Scripts', 'python.exe'))
-        # last resort: the current executable
-        candidates.append(sys.executable)
-        for c in candidates:
-            try:
-                if c and os.path.isfile(c):
-                    default_python = c
-                    break
-            except Exception:
-                continue
-
-        self.python_input = QLineEdit(default_python)
-        self.python_browse = QPushButton('Browse')
-        self.video_input = QLineEdit('')
-        self.video_browse = QPushButton('Browse')
-        self.out_input = QLineEdit(DEFAULT_OUT)
-        self.out_browse = QPushButton('Browse')
-        self.mode_normal = QRadioButton('Normal')
-        self.mode_line = QRadioButton('Line (short captions)')
-        self.mode_normal.setChecked(True)
-        self.max_chars = QSpinBox()
-        self.max_chars.setRange(5, 200)
-        self.max_chars.setValue(15)
-        self.model_select = QComboBox()
-        self.model_select.addItems(['tiny','small','medium','large'])
-        self.model_select.setCurrentText('small')
-
-        self.start_btn = QPushButton('Start')
-        self.stop_btn = QPushButton('Stop')
-        self.open_out_btn = QPushButton('Open Output Folder')
-
-        self.log = QTextEdit()
-        self.log.setReadOnly(True)
-        self.progress = QProgressBar()
-        self.progress.setRange(0, 100)
-
-        # Layout
-        top_layout = QVBoxLayout()
-        # If running as a frozen app, hide the Python executable chooser (not applicable)
-        if getattr(sys, 'frozen', False):
-            info = QLabel('Alma 37:6')
-            top_layout.addWidget(info)
-        else:
-            top_layout.addLayout(self._row_layout('Python executable', self.python_input, self.python_browse))
-        top_layout.addLayout(self._row_layout('Video file', self.video_input, self.video_browse))
-        top_layout.addLayout(self._row_layout('Output directory', self.out_input, self.out_browse))
-        top_layout.addLayout(self._mode_model_layout())
-        top_layout.addLayout(self._button_row_layout())
-        top_layout.addWidget(QLabel('Log:'))
-        top_layout.addWidget(self.log)
-        top_layout.addWidget(self.progress)
-
-        self.setLayout(top_layout)
-
-        # Connections
-        self.python_browse.clicked.connect(self.browse_python)
-        self.video_browse.clicked.connect(self.browse_video)
-        self.out_browse.clicked.connect(self.browse_out)
-        self.start_btn.clicked.connect(self.start)
-        self.stop_btn.clicked.connect(self.stop)
-        self.open_out_btn.clicked.connect(self.open_out)
-
-        self.worker = None
-
-        # import the backend function here to keep module-level imports minimal for PyInstaller
-        def _load_backend():
-            # Try normal import first
-            try:
-                import importlib
-                mod = importlib.import_module('AutoCaptions')
-                self.append_log('AutoCaptions Ready. Please select a video file to start.')
-                return getattr(mod, 'mp4_to_srt', None)
-            except Exception:
-                self.append_log('Normal import of AutoCaptions failed: Please try again or contact support.')
-
-            # Fallback: try loading from known file locations using importlib.util
-            try:
-                import importlib.util
-                candidates = []
-                # same folder as this script
-                candidates.append(os.path.join(SCRIPT_DIR, 'AutoCaptions.py'))
-                # frozen bundle location - prefer this when frozen
-                if getattr(sys, 'frozen', False):
-                    try:
-                        meipass_path = os.path.join(sys._MEIPASS, 'AutoCaptions.py')
-                        candidates.insert(0, meipass_path)
-                        self.append_log(f'Added frozen candidate path: {meipass_path}')
-                    except Exception:
-                        pass
-                # nested src folder
-                candidates.append(os.path.join(SCRIPT_DIR, 'AutoCaptions', 'src', 'AutoCaptions.py'))
-
-                for path in candidates:
-                    try:
-                        self.append_log(f'Trying backend path: {path}')
-                        if path and os.path.isfile(path):
-                            spec = importlib.util.spec_from_file_location('autocaptions_dynamic', path)
-                            module = importlib.util.module_from_spec(spec)
-                            spec.loader.exec_module(module)
-                            self.append_log(f'Backend loaded from file: {path}')
-                            return getattr(module, 'mp4_to_srt', None)
-                        else:
-                            self.append_log(f'Path not found: {path}')
-                    except Exception as e:
-                        import traceback
-                        self.append_log(f'Failed loading {path}: {e}\n')
-                        self.append_log(traceback.format_exc())
-            except Exception:
-                pass
-
-            return None
-
-        self._mp4_to_srt = _load_backend()
-
-    def _row_layout(self, label_text, input_widget, browse_widget):
-        layout = QHBoxLayout()
-        layout.addWidget(QLabel(label_text))
-        layout.addWidget(input_widget)
-        layout.addWidget(browse_widget)
-        return layout
-
-    def _mode_model_layout(self):
-        layout = QHBoxLayout()
-        layout.addWidget(QLabel('Mode:'))
-        layout.addWidget(self.mode_normal)
-        layout.addWidget(self.mode_line)
-        layout.addStretch()
-        layout.addWidget(QLabel('Max chars:'))
-        layout.addWidget(self.max_chars)
-        layout.addWidget(QLabel('Model:'))
-        layout.addWidget(self.model_select)
-        return layout
-
-    def _button_row_layout(self):
-        layout = QHBoxLayout()
-        layout.addWidget(self.start_btn)
-        layout.addWidget(self.stop_btn)
-        layout.addWidget(self.open_out_btn)
-        return layout
-
-    def browse_python(self):
-        p, _ = QFileDialog.getOpenFileName(self, 'Select Python executable', os.path.dirname(sys.executable), 'Python Executable (*.exe)')
-        if p:
-            self.python_input.setText(p)
-
-    def browse_video(self):
-        p, _ = QFileDialog.getOpenFileName(self, 'Select video file', os.path.expanduser('~'), 'Video Files (*.mp4 *.mov *.mkv)')
-        if p:
-            self.video_input.setText(p)
-
-    def browse_out(self):
-        d = QFileDialog.getExistingDirectory(self, 'Select output directory', DEFAULT_OUT)
-        if d:
-            self.out_input.setText(d)
-
-    def append_log(self, text):
-        self.log.moveCursor(QTextCursor.End)
-        self.log.insertPlainText(text)
-        self.log.moveCursor(QTextCursor.End)
-
-        # parse PROGRESS lines like: PROGRESS: 3/25
-        try:
-            for line in text.splitlines():
-                line = line.strip()
-                # when we see progress lines, switch to determinate
-                if line.startswith('PROGRESS_CHUNK:') or line.startswith('PROGRESS:'):
-                    try:
-                        self.progress.setRange(0, 100)
-                    except Exception:
-                        pass
-                if line.startswith('PROGRESS_CHUNK:'):
-                    try:
-                        parts = line.split(':', 1)[1].strip().split('/')
-                        cur = int(parts[0])
-                        total = int(parts[1]) if len(parts) > 1 else 100
-                        pct = int((cur / max(1, total)) * 100)
-                        self.progress.setValue(pct)
-                    except Exception:
-                        pass
-                if line.startswith('PROGRESS:'):
-                    try:
-                        parts = line.split(':', 1)[1].strip().split('/')
-                        cur = int(parts[0])
-                        total = int(parts[1]) if len(parts) > 1 else 100
-                        pct = int((cur / max(1, total)) * 100)
-                        self.progress.setValue(pct)
-                    except Exception:
-                        pass
-        except Exception:
-            pass
-
-    def open_out(self):
-        out = self.out_input.text() or DEFAULT_OUT
-        if not os.path.isdir(out):
-            os.makedirs(out, exist_ok=True)
-        if sys.platform.startswith('win'):
-            subprocess.Popen(['explorer', out])
-        elif sys.platform.startswith('darwin'):
-            subprocess.Popen(['open', out])
-        else:
-            subprocess.Popen(['xdg-open', out])
-
-    def start(self):
-        if self.worker and self.worker.isRunning():
-            QMessageBox.warning(self, 'Warning', 'A process is already running!')
-            return
-        video_file = self.video_input.text()
-        out_dir = self.out_input.text() or DEFAULT_OUT
-        mode_line = self.mode_line.isChecked()
-        max_chars = str(self.max_chars.value())
-        model = self.model_select.currentText()
-
-        if not video_file or not os.path.isfile(video_file):
-            QMessageBox.warning(self, 'Error', 'Please select a valid video file')
-            return
-
-        # set environment variables expected by AutoCaptions
-        os.environ['AUTOCAPTIONS_MAXCHARS'] = max_chars
-        os.environ['AUTOCAPTIONS_MODEL'] = model
-        if out_dir:
-            os.environ['AUTOCAPTIONS_OUTDIR'] = out_dir
-
-        if mode_line:
-            # also support CLI-style flag read by AutoCaptions
-            os.environ['AUTOCAPTIONS_MODE'] = 'line'
-        else:
-            os.environ.pop('AUTOCAPTIONS_MODE', None)
-
-        # If a Python executable is provided (pyenv) or the app is frozen, run the backend via subprocess
-        python_path = self.python_input.text().strip()
-        if getattr(sys, 'frozen', False) or (python_path and os.path.isfile(python_path)):
-            # Build env for subprocess
-            env = os.environ.copy()
-            env['AUTOCAPTIONS_MAXCHARS'] = max_chars
-            env['AUTOCAPTIONS_MODEL'] = model
-            if out_dir:
-                env['AUTOCAPTIONS_OUTDIR'] = out_dir
-            if mode_line:
-                env['AUTOCAPTIONS_MODE'] = 'line'
-
-            # script path: when frozen, try to use the bundled AutoCaptions.py inside _internal or the extracted path
-            if getattr(sys, 'frozen', False):
-                script_candidates = [os.path.join(sys._MEIPASS, 'AutoCaptions.py'), os.path.join(sys._MEIPASS, 'AutoCaptions', 'src', 'AutoCaptions.py')]
-            else:
-                script_candidates = [os.path.join(SCRIPT_DIR, 'AutoCaptions.py'), os.path.join(SCRIPT_DIR, 'AutoCaptions', 'src', 'AutoCaptions.py')]
-
-            script_path = None
-            for s in script_candidates:
-                if s and os.path.isfile(s):
-                    script_path = s
-                    break
-
-            if not script_path:
-                QMessageBox.critical(self, 'Error', 'Backend script not found for subprocess execution')
-                return
-
-            self.log.clear()
-            self.progress.setValue(0)
-            # show indeterminate busy state while backend boots
-            try:
-                self.progress.setRange(0, 0)  # indeterminate
-            except Exception:
-                pass
-            # choose python exe: prefer provided one, else use embedded venv python for build environment
-            chosen_python = python_path if python_path and os.path.isfile(python_path) else sys.executable
-            sub_args = [video_file]
-            if mode_line:
-                # explicitly pass CLI mode to subprocess as a fallback
-                sub_args += ['--mode', 'line']
-            self.worker = SubprocessWorker(chosen_python, script_path, args=sub_args )
-            self.worker.log_line.connect(self.append_log)
-            self.worker.finished.connect(self._finished)
-            self.worker.start()
-
-            self.start_btn.setEnabled(False)
-            self.stop_btn.setEnabled(True)
-            return
-
-        # fallback: run backend inline (same process)
-        if not self._mp4_to_srt:
-            QMessageBox.critical(self, 'Error', 'Backend import failed: cannot find mp4_to_srt')
-            return
-
-        self.log.clear()
-        self.progress.setValue(0)
-        self.worker = Worker(self._mp4_to_srt, args=(video_file, mode_line))
-        self.worker.log_line.connect(self.append_log)
-        self.worker.finished.connect(self._finished)
-        self.worker.start()
-
-        self.start_btn.setEnabled(False)
-        self.stop_btn.setEnabled(True)
-
-    def stop(self):
-        if self.worker:
-            self.worker.stop()
-            self.worker = None
-        self.start_btn.setEnabled(True)
-        self.stop_btn.setEnabled(False)
-        self.progress.setValue(0)
-
-    def _finished(self, code):
-        self.append_log(f"\nProcess finished with code {code}\n")
-        self.start_btn.setEnabled(True)
-        self.stop_btn.setEnabled(False)
-        self.progress.setValue(100)
-
-
-def main():
-    # On Windows, set an explicit AppUserModelID so the taskbar groups and icon behave predictably
-    if sys.platform == 'win32':
-        try:
-            import ctypes
-            ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID('com.riva.truecaptions')
-        except Exception:
-            pass
-
-    def _resolved_icon_path():
-        # Prefer a bundled icon when frozen; fall back to project files when running from source
-        candidates = []
-        if getattr(sys, 'frozen', False):
-            try:
-                candidates.append(os.path.join(sys._MEIPASS, 'sword_of_laban.ico'))
-            except Exception:
-                pass
-        # runtime (source) locations
-        candidates.append(os.path.join(SCRIPT_DIR, 'sword_of_laban.ico'))
-        for p in candidates:
-            try:
-                if p and os.path.isfile(p):
-                    return p
-            except Exception:
-                continue
-        return None
-
-    app = QApplication(sys.argv)
-    # set the application icon (affects titlebar and taskbar)
-    icon_path = None
-    try:
-        icon_path = _resolved_icon_path()
-        if icon_path:
-            app.setWindowIcon(QIcon(icon_path))
-    except Exception:
-        icon_path = None
-
-    win = MainWindow()
-    try:
-        if icon_path:
-            win.setWindowIcon(QIcon(icon_path))
-    except Exception:
-        pass
-    win.show()
-    sys.exit(app.exec())
-
-
-if __name__ == '__main__':
-    main()
+import functools
+import os
+import re
+import signal
+import sys
+import subprocess
+import threading
+import time
+from PySide6.QtGui import QIcon  # add this at the top
+from PySide6 import QtCore, QtWidgets
+from PySide6.QtWidgets import (
+    QApplication,
+    QWidget,
+    QLabel,
+    QLineEdit,
+    QPushButton,
+    QFileDialog,
+    QHBoxLayout,
+    QVBoxLayout,
+    QPlainTextEdit,
+    QRadioButton,
+    QProgressBar,
+    QComboBox,
+    QSpinBox,
+    QMessageBox
+)
+
+from PySide6.QtGui import QIcon
+
+def resource_path(relative_path):
+    """Get absolute path to resource ."""
+    try:
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+
+# matches PROGRESS, PROGRESS_CHUNK and PROGRESS_FFMPEG lines; one scan per
+# chunk replaces per-line startswith/split parsing
+_PROGRESS_RE = re.compile(r'^PROGRESS(?:_CHUNK|_FFMPEG)?:\s*(\d+)\s*/\s*(\d+)', re.M)
+
+
+def _progress_pct(text):
+    """Extract the percentage from the last PROGRESS line in text, or None.
+
+    Runs on worker threads so the GUI thread never pays for the scan; only
+    the final match matters for the bar.
+    """
+    m = None
+    for m in _PROGRESS_RE.finditer(text):
+        pass
+    if m:
+        try:
+            return min(100, int(m[1]) * 100 // max(1, int(m[2])))
+        except Exception:
+            pass
+    return None
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+AUTOCAPTIONS_SCRIPT = os.path.join(SCRIPT_DIR, 'AutoCaptions.py')
+DEFAULT_OUT = os.path.join(SCRIPT_DIR, 'transcriptions')
+os.makedirs(DEFAULT_OUT, exist_ok=True)  # Ensure default folder exists
+
+# backend script used for subprocess execution; sys._MEIPASS and SCRIPT_DIR
+# are fixed for the process lifetime, so resolve once at import instead of
+# re-probing the filesystem on every Start click
+_BACKEND_ROOT = getattr(sys, '_MEIPASS', SCRIPT_DIR) if getattr(sys, 'frozen', False) else SCRIPT_DIR
+BACKEND_SCRIPT = next(
+    (p for p in (
+        os.path.join(_BACKEND_ROOT, 'AutoCaptions.py'),
+        os.path.join(_BACKEND_ROOT, 'AutoCaptions', 'src', 'AutoCaptions.py'),
+    ) if os.path.isfile(p)),
+    None,
+)
+
+def _popen_no_window():
+    """Popen kwargs that keep child consoles hidden on Windows.
+
+    Returns (startupinfo, creationflags); both are no-ops on other
+    platforms. Shared by the one-shot and persistent backend launchers.
+    """
+    startupinfo = None
+    creationflags = 0
+    if sys.platform.startswith('win'):
+        try:
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            startupinfo.wShowWindow = subprocess.SW_HIDE
+            # CREATE_NO_WINDOW prevents a console from being created
+            creationflags = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+        except Exception:
+            startupinfo = None
+    return startupinfo, creationflags
+
+
+@functools.lru_cache(maxsize=1)
+def _default_python_exe():
+    """Resolve the default backend Python executable once per process.
+
+    Each candidate probe is a stat syscall, and cold-cache stats on Windows
+    are slow enough to notice on the UI thread; caching means only the first
+    window construction pays for them. An explicit AUTOCAPTIONS_PYTHON that
+    points at a real file short-circuits the probe list entirely. Returns ''
+    when nothing usable is found.
+    """
+    import stat as _stat
+
+    def _is_file(p):
+        try:
+            return p and _stat.S_ISREG(os.stat(p).st_mode)
+        except OSError:
+            return False
+
+    env_py = os.environ.get('AUTOCAPTIONS_PYTHON') or os.environ.get('AUTOCAPTIONS_PYENV')
+    if _is_file(env_py):
+        return env_py
+    candidates = [
+        # common short-root venv used by build script
+        r'C:\ac_build_venv\Scripts\python.exe',
+        # fallback project-local venvs
+        os.path.join(SCRIPT_DIR, '.build_venv', 'Scripts', 'python.exe'),
+        os.path.join(SCRIPT_DIR, '.venv', 'Scripts', 'python.exe'),
+        # last resort: the current executable
+        sys.executable,
+    ]
+    for c in candidates:
+        if _is_file(c):
+            return c
+    return ''
+
+
+# Try a direct import so PyInstaller detects the module during analysis
+_STATIC_MP4_TO_SRT = None
+try:
+    import AutoCaptions as _auto_mod
+    _STATIC_MP4_TO_SRT = getattr(_auto_mod, 'mp4_to_srt', None)
+except Exception:
+    _STATIC_MP4_TO_SRT = None
+
+
+@functools.lru_cache(maxsize=1)
+def _load_backend():
+    """Resolve the backend mp4_to_srt callable once per process.
+
+    Returns (callable_or_None, startup_messages). Cached so constructing
+    another window doesn't redo the import attempts or exec_module side
+    effects; messages are returned instead of written to a widget so the
+    caller can flush them into the log in one go.
+    """
+    msgs = []
+    if _STATIC_MP4_TO_SRT is not None:
+        msgs.append('AutoCaptions Ready. Please select a video file to start.')
+        return _STATIC_MP4_TO_SRT, msgs
+
+    # Try normal import first
+    try:
+        import importlib
+        mod = importlib.import_module('AutoCaptions')
+        msgs.append('AutoCaptions Ready. Please select a video file to start.')
+        return getattr(mod, 'mp4_to_srt', None), msgs
+    except Exception:
+        msgs.append('Normal import of AutoCaptions failed: Please try again or contact support.')
+
+    # Fallback: try loading from known file locations using importlib.util
+    try:
+        import importlib.util
+        candidates = []
+        # same folder as this script
+        candidates.append(os.path.join(SCRIPT_DIR, 'AutoCaptions.py'))
+        # frozen bundle location - prefer this when frozen
+        if getattr(sys, 'frozen', False):
+            try:
+                meipass_path = os.path.join(sys._MEIPASS, 'AutoCaptions.py')
+                candidates.insert(0, meipass_path)
+                msgs.append(f'Added frozen candidate path: {meipass_path}')
+            except Exception:
+                pass
+        # nested src folder
+        candidates.append(os.path.join(SCRIPT_DIR, 'AutoCaptions', 'src', 'AutoCaptions.py'))
+
+        for path in candidates:
+            try:
+                msgs.append(f'Trying backend path: {path}')
+                if path and os.path.isfile(path):
+                    # allow the .pyc cache to be written so the parse/compile
+                    # cost is paid once, not on every fallback load
+                    sys.dont_write_bytecode = False
+                    spec = importlib.util.spec_from_file_location('autocaptions_dynamic', path)
+                    # LazyLoader defers executing the module body (whisper /
+                    # numpy imports, ffmpeg probe) until an attribute is first
+                    # touched, i.e. until mp4_to_srt is actually called
+                    spec.loader = importlib.util.LazyLoader(spec.loader)
+                    module = importlib.util.module_from_spec(spec)
+                    sys.modules['autocaptions_dynamic'] = module
+                    spec.loader.exec_module(module)
+                    msgs.append(f'Backend loaded from file: {path}')
+
+                    # touching module attributes would trigger the lazy load
+                    # right here, so hand back a thin wrapper that resolves
+                    # mp4_to_srt on the first actual run
+                    def _lazy_mp4_to_srt(*args, **kwargs):
+                        return module.mp4_to_srt(*args, **kwargs)
+
+                    return _lazy_mp4_to_srt, msgs
+                else:
+                    msgs.append(f'Path not found: {path}')
+            except Exception as e:
+                import traceback
+                msgs.append(f'Failed loading {path}: {e}')
+                msgs.append(traceback.format_exc())
+    except Exception:
+        pass
+
+    return None, msgs
+
+
+class Worker(QtCore.QThread):
+    log_line = QtCore.Signal(str)
+    progress = QtCore.Signal(int)
+    finished = QtCore.Signal(int)
+
+    def __init__(self, target_func, args=()):
+        super().__init__()
+        self.target_func = target_func
+        self.args = args
+        self._stop_requested = False
+
+    def run(self):
+        # Capture file descriptors 1 and 2 themselves rather than swapping
+        # sys.stdout for a catcher object: output from C extensions (ffmpeg,
+        # CUDA libraries, tqdm writing to the real descriptor) bypasses
+        # Python's sys.stdout entirely, so a dup2'd pipe is the only way the
+        # log sees it. A reader thread pulls large chunks off the pipe, and
+        # each chunk becomes one queued emit — the chunking is the batching.
+        saved_out = saved_err = None
+        reader = None
+        pipe_r = pipe_w = None
+        try:
+            pipe_r, pipe_w = os.pipe()
+            sys.stdout.flush()
+            sys.stderr.flush()
+            saved_out = os.dup(1)
+            saved_err = os.dup(2)
+            os.dup2(pipe_w, 1)
+            os.dup2(pipe_w, 2)
+            os.close(pipe_w)
+            pipe_w = None
+
+            def _drain():
+                import codecs
+                decoder = codecs.getincrementaldecoder('utf-8')('replace')
+                scan_tail = ''
+                try:
+                    while True:
+                        chunk = os.read(pipe_r, 1 << 18)
+                        if not chunk:
+                            break
+                        text = decoder.decode(chunk)
+                        if text:
+                            # carry the partial last line across reads and
+                            # scan only completed lines, like the other
+                            # workers, so a PROGRESS line split mid-number
+                            # never matches half-formed
+                            combined = scan_tail + text
+                            nl = combined.rfind('\n')
+                            if nl >= 0:
+                                pct = _progress_pct(combined[:nl])
+                                if pct is not None:
+                                    self.progress.emit(pct)
+                                scan_tail = combined[nl + 1:]
+                            else:
+                                scan_tail = combined
+                            self.log_line.emit(text)
+                    tail = decoder.decode(b'', final=True)
+                    if tail:
+                        self.log_line.emit(tail)
+                except Exception:
+                    pass
+                finally:
+                    try:
+                        os.close(pipe_r)
+                    except Exception:
+                        pass
+
+            reader = threading.Thread(target=_drain, daemon=True)
+            reader.start()
+        except Exception:
+            # frozen GUI apps on Windows may have no usable fd 1; run without
+            # capture rather than refusing to transcribe. Roll back any
+            # partial redirection first: if dup2 already pointed fd 1 or 2 at
+            # the pipe, leaving it there with no reader would block the
+            # process as soon as the pipe buffer fills
+            if saved_out is not None:
+                try:
+                    os.dup2(saved_out, 1)
+                except Exception:
+                    pass
+                try:
+                    os.close(saved_out)
+                except Exception:
+                    pass
+            if saved_err is not None:
+                try:
+                    os.dup2(saved_err, 2)
+                except Exception:
+                    pass
+                try:
+                    os.close(saved_err)
+                except Exception:
+                    pass
+            for _fd in (pipe_r, pipe_w):
+                if _fd is not None:
+                    try:
+                        os.close(_fd)
+                    except Exception:
+                        pass
+            saved_out = saved_err = reader = None
+
+        try:
+            try:
+                # Call the transcription function which prints progress lines
+                self.target_func(*self.args)
+                ret = 0
+            except Exception as e:
+                import traceback
+                self.log_line.emit(f"Error in worker: {e}\n")
+                self.log_line.emit(traceback.format_exc())
+                ret = 1
+        finally:
+            # flush the Python text layers, then restore the descriptors;
+            # closing the last write end lets the reader drain and exit
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+            except Exception:
+                pass
+            if saved_out is not None:
+                os.dup2(saved_out, 1)
+                os.close(saved_out)
+            if saved_err is not None:
+                os.dup2(saved_err, 2)
+                os.close(saved_err)
+            if reader is not None:
+                reader.join(timeout=2)
+            self.finished.emit(ret)
+
+    def stop(self):
+        # mp4_to_srt is not cancelable easily; we set a flag in case we add support later
+        self._stop_requested = True
+
+
+class SubprocessWorker(QtCore.QThread):
+    """Run the backend script via an external Python executable and stream stdout to the GUI."""
+    log_line = QtCore.Signal(str)
+    progress = QtCore.Signal(int)
+    finished = QtCore.Signal(int)
+
+    def __init__(self, python_exe, script_path, args=None, env_overrides=None):
+        super().__init__()
+        self.python_exe = python_exe
+        self.script_path = script_path
+        self.args = args or []
+        self.env_overrides = env_overrides or {}
+        self._proc = None
+        self._stop_requested = False
+
+    def run(self):
+        cmd = [self.python_exe, self.script_path] + self.args
+        try:
+            # start subprocess and stream stdout line-by-line
+            startupinfo, creationflags = _popen_no_window()
+            if sys.platform.startswith('win'):
+                # own process group so stop() can deliver CTRL_BREAK_EVENT to
+                # the child without also hitting the GUI process
+                creationflags |= getattr(subprocess, 'CREATE_NEW_PROCESS_GROUP', 0)
+            # Open the pipe in binary mode with no extra buffering layer; the
+            # read loop below pulls large chunks and decodes incrementally,
+            # which avoids the per-line buffered-reader overhead on Windows
+            self._proc = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                # one merged dict here instead of mutating os.environ in the
+                # GUI process and copying it again per launch
+                env={**os.environ, **self.env_overrides},
+                bufsize=0,
+                startupinfo=startupinfo,
+                creationflags=creationflags,
+            )
+
+            if self._proc.stdout:
+                # batch lines before emitting: one queued signal per line means
+                # one GUI wakeup and text-widget insert per line, which swamps
+                # the event loop on chatty backends
+                pending = []
+                last_flush = time.monotonic()
+
+                def _flush_pending():
+                    nonlocal last_flush
+                    if pending:
+                        # keep emissions newline-terminated so batches don't
+                        # glue together in the log widget
+                        self.log_line.emit('\n'.join(pending) + '\n')
+                        pending.clear()
+                    last_flush = time.monotonic()
+
+                # read large chunks from the raw pipe and split into lines in
+                # user space; an incremental decoder keeps multi-byte UTF-8
+                # sequences intact across read boundaries
+                import codecs
+                decoder = codecs.getincrementaldecoder('utf-8')('replace')
+                tail = ''
+                try:
+                    fd = self._proc.stdout.fileno()
+                    # on POSIX, poll with a timeout so a stop() request is
+                    # noticed between reads instead of blocking in os.read
+                    # until the child happens to die; Windows pipes are not
+                    # selectable, so there the loop stays blocking and stop()
+                    # signals the child directly
+                    sel = None
+                    if not sys.platform.startswith('win'):
+                        import selectors
+                        sel = selectors.DefaultSelector()
+                        sel.register(fd, selectors.EVENT_READ)
+                    while True:
+                        if sel is not None:
+                            if self._stop_requested:
+                                break
+                            if not sel.select(0.1):
+                                continue
+                        chunk = os.read(fd, 1 << 18)
+                        if not chunk:
+                            break
+                        data = tail + decoder.decode(chunk)
+                        *lines, tail = data.split('\n')
+                        pending.extend(lines)
+                        # scan only the completed lines so a PROGRESS line
+                        # split across reads isn't matched half-formed
+                        pct = _progress_pct(data[:len(data) - len(tail)] if tail else data)
+                        if pct is not None:
+                            self.progress.emit(pct)
+                        if len(pending) >= 64 or time.monotonic() - last_flush > 0.02:
+                            _flush_pending()
+                    tail += decoder.decode(b'', final=True)
+                    if tail:
+                        pending.append(tail)
+                except Exception as read_exc:
+                    import traceback
+                    self.log_line.emit(f"Error reading backend output: {read_exc}\n")
+                    self.log_line.emit(traceback.format_exc())
+                finally:
+                    _flush_pending()
+            rc = self._proc.wait()
+        except Exception as e:
+            self.log_line.emit(f"Error launching backend: {e}\n")
+            rc = 1
+        finally:
+            self.finished.emit(rc)
+
+    def stop(self):
+        self._stop_requested = True
+        try:
+            if self._proc and self._proc.poll() is None:
+                if sys.platform.startswith('win'):
+                    # CTRL_BREAK reaches the child's console handler so it
+                    # gets a chance to clean up; TerminateProcess does not
+                    try:
+                        self._proc.send_signal(signal.CTRL_BREAK_EVENT)
+                    except Exception:
+                        self._proc.terminate()
+                else:
+                    # SIGTERM is catchable, so the child can remove partial
+                    # output before exiting
+                    self._proc.terminate()
+                # give the child a moment to exit cleanly, then force it so
+                # no zombie process handle outlives the worker thread
+                try:
+                    self._proc.wait(timeout=2)
+                except Exception:
+                    self._proc.kill()
+        except Exception:
+            pass
+
+
+class QProcessWorker(QtCore.QObject):
+    """Run the backend through QProcess instead of Popen plus a reader thread.
+
+    QProcess delivers readyRead notifications on the Qt event loop and uses
+    overlapped (async) I/O for the pipe on Windows, so there is no dedicated
+    Python reader thread, no GIL contention from it, and no queued-signal hop
+    per batch. Output is pulled with one readAll and decoded once per batch.
+    AUTOCAPTIONS_QPROCESS=0 falls back to the thread-based SubprocessWorker.
+    """
+    log_line = QtCore.Signal(str)
+    progress = QtCore.Signal(int)
+    finished = QtCore.Signal(int)
+
+    def __init__(self, python_exe, script_path, args=None, env_overrides=None, parent=None):
+        super().__init__(parent)
+        self.python_exe = python_exe
+        self.script_path = script_path
+        self.args = args or []
+        self.env_overrides = env_overrides or {}
+        self._proc = None
+        self._decoder = None
+        self._tail = ''
+
+    def start(self):
+        import codecs
+        proc = QtCore.QProcess(self)
+        proc.setProcessChannelMode(QtCore.QProcess.MergedChannels)
+        if self.env_overrides:
+            env = QtCore.QProcessEnvironment.systemEnvironment()
+            for k, v in self.env_overrides.items():
+                env.insert(k, v)
+            proc.setProcessEnvironment(env)
+        proc.readyReadStandardOutput.connect(self._on_output)
+        proc.finished.connect(self._on_finished)
+        proc.errorOccurred.connect(self._on_error)
+        self._decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        self._tail = ''
+        self._proc = proc
+        proc.start(self.python_exe, [self.script_path] + self.args)
+
+    def isRunning(self):
+        return self._proc is not None and self._proc.state() != QtCore.QProcess.NotRunning
+
+    def _on_output(self):
+        # one readAll and one incremental decode per notification; the
+        # decoder keeps multi-byte UTF-8 sequences intact across batches
+        data = bytes(self._proc.readAll())
+        if not data:
+            return
+        text = self._decoder.decode(data)
+        if not text:
+            return
+        # scan only completed lines for progress so a PROGRESS line split
+        # across batches is never matched half-formed
+        combined = self._tail + text
+        nl = combined.rfind('\n')
+        if nl >= 0:
+            pct = _progress_pct(combined[:nl])
+            if pct is not None:
+                self.progress.emit(pct)
+            self._tail = combined[nl + 1:]
+        else:
+            self._tail = combined
+        self.log_line.emit(text)
+
+    def _on_finished(self, code, status):
+        try:
+            tail = self._decoder.decode(b'', final=True)
+            if tail:
+                self.log_line.emit(tail)
+        except Exception:
+            pass
+        rc = code if status == QtCore.QProcess.NormalExit else 1
+        self.finished.emit(rc)
+
+    def _on_error(self, err):
+        # FailedToStart never reaches finished, so report it here
+        if err == QtCore.QProcess.FailedToStart:
+            self.log_line.emit(f"Error launching backend: {self._proc.errorString()}\n")
+            self.finished.emit(1)
+
+    def stop(self):
+        try:
+            if self.isRunning():
+                self._proc.terminate()
+                if not self._proc.waitForFinished(2000):
+                    self._proc.kill()
+        except Exception:
+            pass
+
+
+class PersistentBackend(QtCore.QObject):
+    """Keep one warm backend interpreter alive across runs.
+
+    Spawning a fresh Python per Start pays interpreter boot, module imports
+    and Whisper model load every time. This instead launches
+    ``AutoCaptions.py --server`` once and feeds it one JSON job per stdin
+    line; the child keeps its model resident so every run after the first
+    skips the load entirely. Job completion is signalled by ``JOB_DONE: <rc>``
+    lines; everything else streams to the log as usual. If the child dies it
+    is simply relaunched on the next submit.
+    """
+    log_line = QtCore.Signal(str)
+    progress = QtCore.Signal(int)
+    finished = QtCore.Signal(int)
+
+    def __init__(self, python_exe, script_path, parent=None):
+        super().__init__(parent)
+        self.python_exe = python_exe
+        self.script_path = script_path
+        self._proc = None
+        self._reader = None
+        self._busy = False
+
+    def _ensure_proc(self):
+        if self._proc is not None and self._proc.poll() is None:
+            return True
+        try:
+            startupinfo, creationflags = _popen_no_window()
+            self._proc = subprocess.Popen(
+                [self.python_exe, self.script_path, '--server'],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                env=os.environ.copy(),
+                bufsize=0,
+                startupinfo=startupinfo,
+                creationflags=creationflags,
+            )
+        except Exception as e:
+            self.log_line.emit(f"Error launching persistent backend: {e}\n")
+            self._proc = None
+            return False
+        self._reader = threading.Thread(target=self._drain, args=(self._proc,), daemon=True)
+        self._reader.start()
+        return True
+
+    def _drain(self, proc):
+        # same chunked read + incremental decode as SubprocessWorker, but
+        # JOB_DONE lines are consumed here to mark job boundaries instead of
+        # relying on process exit
+        import codecs
+        decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        tail = ''
+        try:
+            fd = proc.stdout.fileno()
+            while True:
+                chunk = os.read(fd, 1 << 18)
+                if not chunk:
+                    break
+                data = tail + decoder.decode(chunk)
+                *lines, tail = data.split('\n')
+                self._handle_lines(lines)
+            tail += decoder.decode(b'', final=True)
+            if tail:
+                self._handle_lines([tail])
+        except Exception as read_exc:
+            self.log_line.emit(f"Error reading backend output: {read_exc}\n")
+        # child exited; if a job was in flight it never completed
+        if self._busy:
+            self._busy = False
+            self.log_line.emit("Persistent backend exited unexpectedly\n")
+            self.finished.emit(1)
+
+    def _handle_lines(self, lines):
+        # batch ordinary output into one queued emit per read, mirroring
+        # SubprocessWorker's pending-lines flush; per-line emits would put
+        # the per-line cross-thread signal traffic back on the default path
+        batch = []
+
+        def _flush_batch():
+            if batch:
+                text = '\n'.join(batch) + '\n'
+                pct = _progress_pct(text)
+                if pct is not None:
+                    self.progress.emit(pct)
+                self.log_line.emit(text)
+                batch.clear()
+
+        for ln in lines:
+            if ln.startswith('JOB_DONE:'):
+                # flush pending output first so the log stays ordered
+                # relative to the completion signal
+                _flush_batch()
+                try:
+                    rc = int(ln.split(':', 1)[1].strip())
+                except Exception:
+                    rc = 1
+                self._busy = False
+                self.finished.emit(rc)
+            elif ln:
+                batch.append(ln)
+        _flush_batch()
+
+    def busy(self):
+        return self._busy
+
+    def submit(self, job):
+        """Send one job dict to the warm worker; returns False if it could
+        not be delivered (caller should fall back to a one-shot run)."""
+        import json
+        if not self._ensure_proc():
+            return False
+        try:
+            self._proc.stdin.write((json.dumps(job) + '\n').encode('utf-8'))
+            self._proc.stdin.flush()
+        except Exception as e:
+            self.log_line.emit(f"Error submitting job to backend: {e}\n")
+            self.stop()
+            return False
+        self._busy = True
+        return True
+
+    def stop(self):
+        try:
+            if self._proc and self._proc.poll() is None:
+                self._proc.kill()
+        except Exception:
+            pass
+        self._proc = None
+        self._busy = False
+
+
+class MainWindow(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle('TrueCaptions')
+        self.resize(400, 550)
+
+        # CSS Styling
+        self.setStyleSheet("""
+            QPushButton { font-size: 14px; padding: 6px; }
+            QProgressBar { height: 20px; border: 1px solid #aaa; border-radius: 8px; }
+            QPlainTextEdit { font-family: Consolas; font-size: 12px; background-color: #f5f5f5; color: #000000; }
+            QSpinBox, QComboBox, QLineEdit { font-size: 13px; color: #f5f5f5; }
+            QPlainTextEdit, QLineEdit, QSpinBox, QComboBox { selection-background-color: #3399ff; selection-color: #ffffff; }
+            QLabel { font-weight: bold; }
+        """)
+
+        # Widgets
+        # Determine a sensible default Python executable. When running from a built exe
+        # sys.executable will be the exe itself which is not a usable python interpreter
+        # for creating venvs or running pip. Prefer an explicit short-root build venv
+        # or a project venv, or an env override `AUTOCAPTIONS_PYTHON` if provided.
+        # Resolution is memoized at module scope so repeat constructions skip
+        # the filesystem probes.
+        self.python_input = QLineEdit(_default_python_exe())
+        self.python_browse = QPushButton('Browse')
+        self.video_input = QLineEdit('')
+        self.video_browse = QPushButton('Browse')
+        self.out_input = QLineEdit(DEFAULT_OUT)
+        self.out_browse = QPushButton('Browse')
+        self.mode_normal = QRadioButton('Normal')
+        self.mode_line = QRadioButton('Line (short captions)')
+        self.mode_normal.setChecked(True)
+        self.max_chars = QSpinBox()
+        self.max_chars.setRange(5, 200)
+        self.max_chars.setValue(15)
+        self.model_select = QComboBox()
+        self.model_select.addItems(['tiny','small','medium','large'])
+        self.model_select.setCurrentText('small')
+
+        self.start_btn = QPushButton('Start')
+        self.stop_btn = QPushButton('Stop')
+        self.open_out_btn = QPushButton('Open Output Folder')
+
+        # QPlainTextEdit is built for streaming logs: appends are constant
+        # time and the block cap bounds memory on very long runs
+        self.log = QPlainTextEdit()
+        self.log.setReadOnly(True)
+        self.log.setMaximumBlockCount(5000)
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 100)
+
+        # Layout
+        top_layout = QVBoxLayout()
+        # If running as a frozen app, hide the Python executable chooser (not applicable)
+        if getattr(sys, 'frozen', False):
+            info = QLabel('Alma 37:6')
+            top_layout.addWidget(info)
+        else:
+            top_layout.addLayout(self._row_layout('Python executable', self.python_input, self.python_browse))
+        top_layout.addLayout(self._row_layout('Video file', self.video_input, self.video_browse))
+        top_layout.addLayout(self._row_layout('Output directory', self.out_input, self.out_browse))
+        top_layout.addLayout(self._mode_model_layout())
+        top_layout.addLayout(self._button_row_layout())
+        top_layout.addWidget(QLabel('Log:'))
+        top_layout.addWidget(self.log)
+        top_layout.addWidget(self.progress)
+
+        self.setLayout(top_layout)
+
+        # Connections
+        self.python_browse.clicked.connect(self.browse_python)
+        self.video_browse.clicked.connect(self.browse_video)
+        self.out_browse.clicked.connect(self.browse_out)
+        self.start_btn.clicked.connect(self.start)
+        self.stop_btn.clicked.connect(self.stop)
+        self.open_out_btn.clicked.connect(self.open_out)
+
+        self.worker = None
+        self._persistent = None
+
+        # throttle log/progress updates: emissions buffer here and a ~30 Hz
+        # single-shot timer applies them in one insert and one repaint, so
+        # backend verbosity can't outpace the screen
+        self._log_pending = []
+        self._pending_pct = None
+        self._flush_timer = QtCore.QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(33)
+        self._flush_timer.timeout.connect(self._flush_log)
+
+        # backend resolution is cached at module scope; its startup messages
+        # go in as one setPlainText rather than per-line append_log calls,
+        # skipping the progress-parse and timer machinery during cold start
+        self._mp4_to_srt, backend_msgs = _load_backend()
+        if backend_msgs:
+            self.log.setPlainText('\n'.join(backend_msgs))
+
+    def _row_layout(self, label_text, input_widget, browse_widget):
+        layout = QHBoxLayout()
+        layout.addWidget(QLabel(label_text))
+        layout.addWidget(input_widget)
+        layout.addWidget(browse_widget)
+        return layout
+
+    def _mode_model_layout(self):
+        layout = QHBoxLayout()
+        layout.addWidget(QLabel('Mode:'))
+        layout.addWidget(self.mode_normal)
+        layout.addWidget(self.mode_line)
+        layout.addStretch()
+        layout.addWidget(QLabel('Max chars:'))
+        layout.addWidget(self.max_chars)
+        layout.addWidget(QLabel('Model:'))
+        layout.addWidget(self.model_select)
+        return layout
+
+    def _button_row_layout(self):
+        layout = QHBoxLayout()
+        layout.addWidget(self.start_btn)
+        layout.addWidget(self.stop_btn)
+        layout.addWidget(self.open_out_btn)
+        return layout
+
+    def browse_python(self):
+        p, _ = QFileDialog.getOpenFileName(self, 'Select Python executable', os.path.dirname(sys.executable), 'Python Executable (*.exe)')
+        if p:
+            self.python_input.setText(p)
+
+    def browse_video(self):
+        p, _ = QFileDialog.getOpenFileName(self, 'Select video file', os.path.expanduser('~'), 'Video Files (*.mp4 *.mov *.mkv)')
+        if p:
+            self.video_input.setText(p)
+
+    def browse_out(self):
+        d = QFileDialog.getExistingDirectory(self, 'Select output directory', DEFAULT_OUT)
+        if d:
+            self.out_input.setText(d)
+
+    def append_log(self, text):
+        # progress parsing happens on the worker threads (set_progress slot);
+        # here we only buffer text for the next timer tick
+        self._log_pending.append(text)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def set_progress(self, pct):
+        # store and let the ~30 Hz timer apply it alongside the text, so a
+        # chatty backend can't force per-line bar repaints
+        self._pending_pct = pct
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _flush_log(self):
+        if self._log_pending:
+            text = ''.join(self._log_pending)
+            self._log_pending = []
+            self.log.appendPlainText(text.rstrip('\n'))
+        if self._pending_pct is not None:
+            # seeing progress switches the bar from indeterminate to determinate
+            try:
+                self.progress.setRange(0, 100)
+                self.progress.setValue(self._pending_pct)
+            except Exception:
+                pass
+            self._pending_pct = None
+
+    def open_out(self):
+        out = self.out_input.text() or DEFAULT_OUT
+        if not os.path.isdir(out):
+            os.makedirs(out, exist_ok=True)
+        if sys.platform.startswith('win'):
+            opener = 'explorer'
+        elif sys.platform.startswith('darwin'):
+            opener = 'open'
+        else:
+            opener = 'xdg-open'
+        # startDetached returns immediately and keeps no process handle, so
+        # the button stays responsive even when shell startup is slow (cold
+        # COM initialization on Windows)
+        QtCore.QProcess.startDetached(opener, [out])
+
+    def start(self):
+        if self.worker is not None:
+            # PersistentBackend is not a QThread; it reports busy() instead
+            running = self.worker.busy() if isinstance(self.worker, PersistentBackend) else self.worker.isRunning()
+            if running:
+                QMessageBox.warning(self, 'Warning', 'A process is already running!')
+                return
+        video_file = self.video_input.text()
+        out_dir = self.out_input.text() or DEFAULT_OUT
+        mode_line = self.mode_line.isChecked()
+        max_chars = str(self.max_chars.value())
+        model = self.model_select.currentText()
+
+        if not video_file or not os.path.isfile(video_file):
+            QMessageBox.warning(self, 'Error', 'Please select a valid video file')
+            return
+
+        # environment knobs expected by AutoCaptions; kept as a small
+        # overrides dict and merged into the child environment at launch
+        # instead of mutating os.environ and copying it per Start click
+        env_overrides = {
+            'AUTOCAPTIONS_MAXCHARS': max_chars,
+            'AUTOCAPTIONS_MODEL': model,
+        }
+        if out_dir:
+            env_overrides['AUTOCAPTIONS_OUTDIR'] = out_dir
+        # always set the mode so a stale AUTOCAPTIONS_MODE=line inherited
+        # from the GUI's own environment can't force line mode when Normal
+        # is selected; the backend treats '' as normal
+        env_overrides['AUTOCAPTIONS_MODE'] = 'line' if mode_line else ''
+
+        # If a Python executable is provided (pyenv) or the app is frozen, run the backend via subprocess
+        python_path = self.python_input.text().strip()
+        if getattr(sys, 'frozen', False) or (python_path and os.path.isfile(python_path)):
+            # script path was resolved once at import (frozen bundle or
+            # source checkout)
+            script_path = BACKEND_SCRIPT
+            if not script_path:
+                QMessageBox.critical(self, 'Error', 'Backend script not found for subprocess execution')
+                return
+
+            self.log.clear()
+            self.progress.setValue(0)
+            # show indeterminate busy state while backend boots
+            try:
+                self.progress.setRange(0, 0)  # indeterminate
+            except Exception:
+                pass
+            # choose python exe: prefer provided one, else use embedded venv python for build environment
+            chosen_python = python_path if python_path and os.path.isfile(python_path) else sys.executable
+
+            # warm-worker path: reuse a resident `--server` child so repeat
+            # runs skip interpreter boot and the Whisper model load.
+            # AUTOCAPTIONS_PERSISTENT=0 restores one subprocess per run.
+            if os.environ.get('AUTOCAPTIONS_PERSISTENT', '1') != '0':
+                if (self._persistent is None
+                        or self._persistent.python_exe != chosen_python
+                        or self._persistent.script_path != script_path):
+                    if self._persistent is not None:
+                        self._persistent.stop()
+                    self._persistent = PersistentBackend(chosen_python, script_path, parent=self)
+                    self._persistent.log_line.connect(self.append_log)
+                    self._persistent.progress.connect(self.set_progress)
+                    self._persistent.finished.connect(self._finished)
+                job = {
+                    'video': video_file,
+                    'mode': 'line' if mode_line else 'normal',
+                    'max_chars': max_chars,
+                    'model': model,
+                    'out_dir': out_dir,
+                }
+                if self._persistent.submit(job):
+                    self.worker = self._persistent
+                    self.start_btn.setEnabled(False)
+                    self.stop_btn.setEnabled(True)
+                    return
+                # could not reach the warm worker; fall back to a one-shot run
+
+            sub_args = [video_file]
+            if mode_line:
+                # explicitly pass CLI mode to subprocess as a fallback
+                sub_args += ['--mode', 'line']
+            # QProcess keeps pipe reads on the event loop with no reader
+            # thread; AUTOCAPTIONS_QPROCESS=0 restores the threaded worker
+            if os.environ.get('AUTOCAPTIONS_QPROCESS', '1') != '0':
+                self.worker = QProcessWorker(chosen_python, script_path, args=sub_args, env_overrides=env_overrides, parent=self)
+            else:
+                self.worker = SubprocessWorker(chosen_python, script_path, args=sub_args, env_overrides=env_overrides)
+            self.worker.log_line.connect(self.append_log)
+            self.worker.progress.connect(self.set_progress)
+            self.worker.finished.connect(self._finished)
+            self.worker.start()
+
+            self.start_btn.setEnabled(False)
+            self.stop_btn.setEnabled(True)
+            return
+
+        # fallback: run backend inline (same process)
+        if not self._mp4_to_srt:
+            QMessageBox.critical(self, 'Error', 'Backend import failed: cannot find mp4_to_srt')
+            return
+
+        # inline mode runs the backend in this process, so the knobs have to
+        # live in our own environment
+        os.environ.update(env_overrides)
+        if not mode_line:
+            os.environ.pop('AUTOCAPTIONS_MODE', None)
+
+        self.log.clear()
+        self.progress.setValue(0)
+        self.worker = Worker(self._mp4_to_srt, args=(video_file, mode_line))
+        self.worker.log_line.connect(self.append_log)
+        self.worker.progress.connect(self.set_progress)
+        self.worker.finished.connect(self._finished)
+        self.worker.start()
+
+        self.start_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
+
+    def stop(self):
+        if self.worker:
+            self.worker.stop()
+            self.worker = None
+        self.start_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
+        self.progress.setValue(0)
+
+    def _finished(self, code):
+        self.append_log(f"\nProcess finished with code {code}\n")
+        # retire finished QThread workers so their thread and process handles
+        # don't accumulate over a long session; the persistent backend is a
+        # plain QObject that deliberately stays alive between runs
+        if isinstance(self.worker, QtCore.QThread):
+            try:
+                self.worker.quit()
+                self.worker.wait()
+                self.worker.deleteLater()
+            except Exception:
+                pass
+        elif isinstance(self.worker, QProcessWorker):
+            self.worker.deleteLater()
+        self.worker = None
+        self.start_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
+        self.progress.setValue(100)
+
+
+def main():
+    # On Windows, set an explicit AppUserModelID so the taskbar groups and icon behave predictably
+    if sys.platform == 'win32':
+        try:
+            import ctypes
+            ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID('com.riva.truecaptions')
+        except Exception:
+            pass
+
+    def _resolved_icon_path():
+        # Prefer a bundled icon when frozen; fall back to project files when running from source
+        candidates = []
+        if getattr(sys, 'frozen', False):
+            try:
+                candidates.append(os.path.join(sys._MEIPASS, 'sword_of_laban.ico'))
+            except Exception:
+                pass
+        # runtime (source) locations
+        candidates.append(os.path.join(SCRIPT_DIR, 'sword_of_laban.ico'))
+        for p in candidates:
+            try:
+                if p and os.path.isfile(p):
+                    return p
+            except Exception:
+                continue
+        return None
+
+    app = QApplication(sys.argv)
+    # set the application icon (affects titlebar and taskbar); build the
+    # QIcon once — each construction re-reads the .ico and decodes every
+    # embedded size, and both the app and the window can share one instance
+    icon = None
+    try:
+        icon_path = _resolved_icon_path()
+        if icon_path:
+            icon = QIcon(icon_path)
+            app.setWindowIcon(icon)
+    except Exception:
+        icon = None
+
+    win = MainWindow()
+    try:
+        if icon:
+            win.setWindowIcon(icon)
+    except Exception:
+        pass
+    win.show()
+    sys.exit(app.exec())
+
+
+if __name__ == '__main__':
+    main()